@@ -1,17 +1,34 @@
+import asyncio
+import base64
+import json
 import logging
 import re
+import time
 import typing
 from http.cookiejar import MozillaCookieJar
-from urllib.parse import parse_qs, urlparse
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import httpx
 
-from ..utils import get_response, raise_for_status, safe_json
+from ..utils import (
+    SingleFlight,
+    get_response,
+    iter_ordered,
+    raise_for_status,
+    safe_json,
+)
+from .cache import ApiCache
+from .rate_limiter import RateLimiter, create_rate_limiter, send_rate_limited
 from .constants import (
     AMP_API_URL,
     APPLE_MUSIC_COOKIE_DOMAIN,
     APPLE_MUSIC_HOMEPAGE_URL,
+    CATALOG_FIELDS_PROFILES,
+    DEVELOPER_TOKEN_EXPIRY_MARGIN,
     LICENSE_API_URL,
+    RATE_LIMIT_RETRIES,
+    RATE_LIMITS,
     WEBPLAYBACK_API_URL,
 )
 
@@ -25,11 +42,23 @@ class AppleMusicApi:
         language: str = "en-US",
         media_user_token: str | None = None,
         developer_token: str | None = None,
+        developer_token_cache_path: str | None = None,
+        api_cache_path: str | None = None,
+        pagination_concurrency: int = 1,
+        fields_profile: str = "full",
+        rate_limit_scale: float = 1.0,
     ) -> None:
         self.storefront = storefront
         self.language = language
         self.media_user_token = media_user_token
         self.token = developer_token
+        self.developer_token_cache_path = developer_token_cache_path
+        self.api_cache_path = api_cache_path
+        self.pagination_concurrency = pagination_concurrency
+        self.fields_profile = fields_profile
+        self.rate_limit_scale = rate_limit_scale
+        self._token_lock = asyncio.Lock()
+        self._single_flight = SingleFlight()
 
     @classmethod
     async def create_from_netscape_cookies(
@@ -90,21 +119,45 @@ class AppleMusicApi:
         language: str = "en-US",
         media_user_token: str | None = None,
         developer_token: str | None = None,
+        developer_token_cache_path: str | None = None,
+        api_cache_path: str | None = None,
+        pagination_concurrency: int = 1,
+        fields_profile: str = "full",
+        rate_limit_scale: float = 1.0,
     ) -> "AppleMusicApi":
         api = cls(
             storefront=storefront,
             language=language,
             media_user_token=media_user_token,
             developer_token=developer_token,
+            developer_token_cache_path=developer_token_cache_path,
+            api_cache_path=api_cache_path,
+            pagination_concurrency=pagination_concurrency,
+            fields_profile=fields_profile,
+            rate_limit_scale=rate_limit_scale,
         )
         await api.initialize()
         return api
 
     async def initialize(self) -> None:
+        self._initialize_cache()
+        self._initialize_rate_limiters()
         await self._initialize_client()
         await self._initialize_token()
         await self._initialize_account_info()
 
+    def _initialize_cache(self) -> None:
+        self.cache = ApiCache(self.api_cache_path) if self.api_cache_path else None
+
+    def _initialize_rate_limiters(self) -> None:
+        self.rate_limiters = {
+            family: create_rate_limiter(
+                **RATE_LIMITS[family],
+                scale=self.rate_limit_scale,
+            )
+            for family in ("catalog", "webplayback", "license")
+        }
+
     async def _initialize_client(self) -> None:
         self.client = httpx.AsyncClient(
             headers={
@@ -153,10 +206,179 @@ class AppleMusicApi:
         logger.debug(f"Token: {token}")
         return token
 
+    @staticmethod
+    def _get_token_expiry(token: str) -> int | None:
+        try:
+            payload = token.split(".")[1]
+            return int(
+                json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))[
+                    "exp"
+                ]
+            )
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    def _load_cached_token(self) -> str | None:
+        if not self.developer_token_cache_path:
+            return None
+
+        try:
+            token_cache = json.loads(
+                Path(self.developer_token_cache_path).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return None
+
+        token = token_cache.get("token")
+        expires = token_cache.get("expires")
+        if not token or not expires:
+            return None
+        if expires - DEVELOPER_TOKEN_EXPIRY_MARGIN <= time.time():
+            logger.debug("Cached developer token has expired")
+            return None
+
+        logger.debug(f"Using cached developer token expiring at {expires}")
+        return token
+
+    def _save_cached_token(self, token: str) -> None:
+        if not self.developer_token_cache_path:
+            return
+
+        expires = self._get_token_expiry(token)
+        if expires is None:
+            return
+
+        token_cache_path = Path(self.developer_token_cache_path)
+        token_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        token_cache_path.write_text(
+            json.dumps({"token": token, "expires": expires}),
+            encoding="utf-8",
+        )
+
     async def _initialize_token(self) -> None:
-        self.token = self.token or await self._get_token()
+        if not self.token:
+            self.token = self._load_cached_token()
+        if not self.token:
+            self.token = await self._get_token()
+            self._save_cached_token(self.token)
         self.client.headers.update({"authorization": f"Bearer {self.token}"})
 
+    async def refresh_token(self, expired_token: str) -> None:
+        async with self._token_lock:
+            if self.token != expired_token:
+                return
+
+            logger.debug("Refreshing developer token")
+            self.token = await self._get_token()
+            self._save_cached_token(self.token)
+            self.client.headers.update({"authorization": f"Bearer {self.token}"})
+
+    def _get_rate_limiter(self, url: str) -> RateLimiter:
+        if url.startswith(WEBPLAYBACK_API_URL):
+            return self.rate_limiters["webplayback"]
+        if url.startswith(LICENSE_API_URL):
+            return self.rate_limiters["license"]
+        return self.rate_limiters["catalog"]
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await send_rate_limited(
+            self._get_rate_limiter(url),
+            lambda: self.client.request(method, url, **kwargs),
+            RATE_LIMIT_RETRIES,
+        )
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if method != "GET":
+            return await self._request_authorized(method, url, **kwargs)
+
+        return await self._single_flight.run(
+            (
+                url,
+                urlencode(sorted(kwargs.get("params", {}).items()), doseq=True),
+                tuple(sorted(kwargs.get("headers", {}).items())),
+            ),
+            lambda: self._request_authorized(method, url, **kwargs),
+        )
+
+    async def _request_authorized(
+        self,
+        method: str,
+        url: str,
+        **kwargs,
+    ) -> httpx.Response:
+        token = self.token
+        response = await self._send(method, url, **kwargs)
+        if response.status_code == 401:
+            await self.refresh_token(token)
+            response = await self._send(method, url, **kwargs)
+        return response
+
+    def _get_fields(self, resource: str, fields: dict[str, str] | None) -> dict:
+        if fields is not None:
+            return fields
+        return CATALOG_FIELDS_PROFILES[self.fields_profile].get(resource, {})
+
+    def _decode_json(self, resource: str, response: httpx.Response) -> dict:
+        start_time = time.perf_counter()
+        api_data = safe_json(response)
+        logger.debug(
+            f"Decoded {len(response.content)} bytes of {resource} "
+            f"in {(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return api_data
+
+    async def _request_cached(
+        self,
+        resource: str,
+        url: str,
+        params: dict,
+    ) -> httpx.Response:
+        if not self.cache:
+            return await self._request("GET", url, params=params)
+
+        cache_key = "|".join(
+            [
+                self.storefront,
+                self.language,
+                url,
+                urlencode(sorted(params.items())),
+            ]
+        )
+        cache_entry = self.cache.get(cache_key)
+        if cache_entry and not cache_entry.expired:
+            return httpx.Response(
+                200,
+                content=cache_entry.body,
+                request=httpx.Request("GET", url),
+            )
+
+        response = await self._request(
+            "GET",
+            url,
+            params=params,
+            headers=(
+                {"if-none-match": cache_entry.etag}
+                if cache_entry and cache_entry.etag
+                else {}
+            ),
+        )
+        if response.status_code == 304 and cache_entry:
+            self.cache.revalidate(cache_key, resource)
+            return httpx.Response(
+                200,
+                content=cache_entry.body,
+                request=response.request,
+            )
+        if response.status_code == 200:
+            self.cache.set(
+                cache_key,
+                resource,
+                response.content,
+                response.headers.get("etag"),
+            )
+
+        return response
+
     async def _initialize_account_info(self) -> None:
         if not self.media_user_token:
             return
@@ -187,7 +409,8 @@ class AppleMusicApi:
         return data[0].get("attributes", {}).get("restrictions")
 
     async def get_account_info(self, meta: str | None = "subscription") -> dict:
-        response = await self.client.get(
+        response = await self._request(
+            "GET",
             f"{AMP_API_URL}/v1/me/account",
             params={
                 **({"meta": meta} if meta else {}),
@@ -207,12 +430,15 @@ class AppleMusicApi:
         song_id: str,
         extend: str = "extendedAssetUrls",
         include: str = "lyrics,albums",
+        fields: dict[str, str] | None = None,
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request_cached(
+            "songs",
             f"{AMP_API_URL}/v1/catalog/{self.storefront}/songs/{song_id}",
             params={
                 "extend": extend,
                 "include": include,
+                **self._get_fields("songs", fields),
             },
         )
         raise_for_status(response, {200, 404})
@@ -220,19 +446,42 @@ class AppleMusicApi:
         if response.status_code == 404:
             return None
 
-        song = safe_json(response)
+        song = self._decode_json("songs", response)
         if not "data" in song:
             raise Exception("Error getting song:", response.text)
         logger.debug(f"Song: {song}")
 
         return song
 
+    async def get_songs(
+        self,
+        song_ids: list[str],
+        include: str = "lyrics",
+    ) -> dict:
+        response = await self._request(
+            "GET",
+            f"{AMP_API_URL}/v1/catalog/{self.storefront}/songs",
+            params={
+                "ids": ",".join(song_ids),
+                "include": include,
+            },
+        )
+        raise_for_status(response)
+
+        songs = safe_json(response)
+        if not "data" in songs:
+            raise Exception("Error getting songs:", response.text)
+        logger.debug(f"Songs: {songs}")
+
+        return songs
+
     async def get_music_video(
         self,
         music_video_id: str,
         include: str = "albums",
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request_cached(
+            "music-videos",
             f"{AMP_API_URL}/v1/catalog/{self.storefront}/music-videos/{music_video_id}",
             params={
                 "include": include,
@@ -254,7 +503,8 @@ class AppleMusicApi:
         self,
         post_id: str,
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request(
+            "GET",
             f"{AMP_API_URL}/v1/catalog/{self.storefront}/uploaded-videos/{post_id}"
         )
         raise_for_status(response, {200, 404})
@@ -273,11 +523,14 @@ class AppleMusicApi:
         self,
         album_id: str,
         extend: str = "extendedAssetUrls",
+        fields: dict[str, str] | None = None,
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request_cached(
+            "albums",
             f"{AMP_API_URL}/v1/catalog/{self.storefront}/albums/{album_id}",
             params={
                 "extend": extend,
+                **self._get_fields("albums", fields),
             },
         )
         raise_for_status(response, {200, 404})
@@ -285,7 +538,7 @@ class AppleMusicApi:
         if response.status_code == 404:
             return None
 
-        album = safe_json(response)
+        album = self._decode_json("albums", response)
         if not "data" in album:
             raise Exception("Error getting album:", response.text)
         logger.debug(f"Album: {album}")
@@ -297,12 +550,15 @@ class AppleMusicApi:
         playlist_id: str,
         limit_tracks: int = 300,
         extend: str = "extendedAssetUrls",
+        fields: dict[str, str] | None = None,
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request_cached(
+            "playlists",
             f"{AMP_API_URL}/v1/catalog/{self.storefront}/playlists/{playlist_id}",
             params={
                 "limit[tracks]": limit_tracks,
                 "extend": extend,
+                **self._get_fields("playlists", fields),
             },
         )
         raise_for_status(response, {200, 404})
@@ -310,7 +566,7 @@ class AppleMusicApi:
         if response.status_code == 404:
             return None
 
-        playlist = safe_json(response)
+        playlist = self._decode_json("playlists", response)
         if not "data" in playlist:
             raise Exception("Error getting playlist:", response.text)
         logger.debug(f"Playlist: {playlist}")
@@ -323,7 +579,8 @@ class AppleMusicApi:
         include: str = "albums,music-videos",
         limit: int = 100,
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request_cached(
+            "artists",
             f"{AMP_API_URL}/v1/catalog/{self.storefront}/artists/{artist_id}",
             params={
                 "include": include,
@@ -347,7 +604,8 @@ class AppleMusicApi:
         album_id: str,
         extend: str = "extendedAssetUrls",
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request(
+            "GET",
             f"{AMP_API_URL}/v1/me/library/albums/{album_id}",
             params={
                 "extend": extend,
@@ -372,7 +630,8 @@ class AppleMusicApi:
         limit: int = 100,
         extend: str = "extendedAssetUrls",
     ) -> dict | None:
-        response = await self.client.get(
+        response = await self._request(
+            "GET",
             f"{AMP_API_URL}/v1/me/library/playlists/{playlist_id}",
             params={
                 "include": include,
@@ -398,7 +657,8 @@ class AppleMusicApi:
         limit: int = 50,
         offset: int = 0,
     ) -> dict:
-        response = await self.client.get(
+        response = await self._request(
+            "GET",
             f"{AMP_API_URL}/v1/catalog/{self.storefront}/search",
             params={
                 "term": term,
@@ -427,6 +687,31 @@ class AppleMusicApi:
 
         next_uri_params = parse_qs(urlparse(next_uri).query)
         limit = int(next_uri_params["offset"][0])
+        total = api_response.get("meta", {}).get("total")
+        if total and self.pagination_concurrency > 1:
+            extended_api_data = {}
+            async for extended_api_data in iter_ordered(
+                (
+                    self._get_extended_api_data(
+                        urlparse(next_uri)
+                        ._replace(
+                            query=urlencode(
+                                {**next_uri_params, "offset": offset},
+                                doseq=True,
+                            )
+                        )
+                        .geturl(),
+                        limit,
+                        extend,
+                    )
+                    for offset in range(limit, total, limit)
+                ),
+                self.pagination_concurrency,
+            ):
+                yield extended_api_data
+            # Fall back to following links if the total was stale
+            next_uri = extended_api_data.get("next")
+
         while next_uri:
             extended_api_data = await self._get_extended_api_data(
                 next_uri,
@@ -442,7 +727,8 @@ class AppleMusicApi:
         limit: int,
         extend: str,
     ) -> dict:
-        response = await self.client.get(
+        response = await self._request(
+            "GET",
             AMP_API_URL + next_uri,
             params={
                 "limit": limit,
@@ -463,7 +749,8 @@ class AppleMusicApi:
         self,
         track_id: str,
     ) -> dict:
-        response = await self.client.post(
+        response = await self._request(
+            "POST",
             WEBPLAYBACK_API_URL,
             json={
                 "salableAdamId": track_id,
@@ -486,7 +773,8 @@ class AppleMusicApi:
         challenge: str,
         key_system: str = "com.widevine.alpha",
     ) -> dict:
-        response = await self.client.post(
+        response = await self._request(
+            "POST",
             LICENSE_API_URL,
             json={
                 "challenge": challenge,
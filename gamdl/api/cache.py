@@ -0,0 +1,126 @@
+import logging
+import sqlite3
+import time
+import typing
+from pathlib import Path
+
+from .constants import API_CACHE_MAX_SIZE, API_CACHE_TTLS
+
+logger = logging.getLogger(__name__)
+
+
+class ApiCacheEntry(typing.NamedTuple):
+    body: bytes
+    etag: str | None
+    expired: bool
+
+
+class ApiCache:
+    def __init__(
+        self,
+        cache_path: str,
+        max_size: int = API_CACHE_MAX_SIZE,
+        ttls: dict[str, int] = API_CACHE_TTLS,
+    ) -> None:
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.ttls = ttls
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "evictions": 0,
+        }
+        self.initialize()
+
+    def initialize(self) -> None:
+        Path(self.cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.cache_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "resource TEXT NOT NULL, "
+            "body BLOB NOT NULL, "
+            "etag TEXT, "
+            "expires REAL NOT NULL, "
+            "accessed REAL NOT NULL, "
+            "size INTEGER NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> ApiCacheEntry | None:
+        row = self.connection.execute(
+            "SELECT body, etag, expires FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        body, etag, expires = row
+        expired = expires <= time.time()
+        if expired:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+            self.connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self.connection.commit()
+
+        return ApiCacheEntry(body, etag, expired)
+
+    def set(
+        self,
+        key: str,
+        resource: str,
+        body: bytes,
+        etag: str | None = None,
+    ) -> None:
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, resource, body, etag, expires, accessed, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, resource, body, etag, now + self.ttls[resource], now, len(body)),
+        )
+        self.connection.commit()
+        self.evict()
+
+    def revalidate(self, key: str, resource: str) -> None:
+        now = time.time()
+        self.stats["revalidations"] += 1
+        self.connection.execute(
+            "UPDATE responses SET expires = ?, accessed = ? WHERE key = ?",
+            (now + self.ttls[resource], now, key),
+        )
+        self.connection.commit()
+
+    def evict(self) -> None:
+        total_size = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        evicted = 0
+        for key, size in self.connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall():
+            if total_size <= self.max_size:
+                break
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total_size -= size
+            evicted += 1
+        self.connection.commit()
+
+        self.stats["evictions"] += evicted
+        logger.debug(f"Evicted {evicted} API cache entries")
+
+    def close(self) -> None:
+        logger.debug(f"API cache stats: {self.stats}")
+        self.connection.close()
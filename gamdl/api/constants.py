@@ -8,6 +8,58 @@ LICENSE_API_URL = (
     "https://play.itunes.apple.com/WebObjects/MZPlay.woa/wa/acquireWebPlaybackLicense"
 )
 
+DEVELOPER_TOKEN_EXPIRY_MARGIN = 300
+RATE_LIMITS = {
+    "catalog": {"rate": 20.0, "burst": 20},
+    "webplayback": {"rate": 5.0, "burst": 5},
+    "license": {"rate": 5.0, "burst": 5},
+    "itunes-lookup": {"rate": 5.0, "burst": 5},
+    "itunes-page": {"rate": 5.0, "burst": 5},
+}
+RATE_LIMIT_RETRIES = 5
+ITUNES_LOOKUP_BATCH_SIZE = 50
+ITUNES_LOOKUP_BATCH_WINDOW = 0.05
+ITUNES_LOOKUP_ENTITY_WRAPPER_TYPES = {
+    "album": "collection",
+    "song": "track",
+    "musicVideo": "track",
+}
+CATALOG_SONG_FIELDS = (
+    "name,hasLyrics,playParams,artwork,extendedAssetUrls,previews,url,"
+    "durationInMillis,contentRating,albumName,artistName,trackNumber,discNumber,"
+    "releaseDate,genreNames,composerName,albums,lyrics"
+)
+CATALOG_MUSIC_VIDEO_FIELDS = "name,playParams,artwork,url,durationInMillis,contentRating"
+CATALOG_FIELDS_PROFILES = {
+    "full": {},
+    "download": {
+        "songs": {
+            "include": "albums,lyrics",
+            "fields[songs]": CATALOG_SONG_FIELDS,
+            "fields[albums]": "name",
+            "fields[lyrics]": "ttml",
+        },
+        "albums": {
+            "fields[albums]": "name,artistName,copyright,isCompilation,playParams,"
+            "artwork,trackCount,releaseDate,contentRating,tracks",
+            "fields[songs]": CATALOG_SONG_FIELDS,
+            "fields[music-videos]": CATALOG_MUSIC_VIDEO_FIELDS,
+        },
+        "playlists": {
+            "fields[playlists]": "name,curatorName,playParams,artwork,tracks",
+            "fields[songs]": CATALOG_SONG_FIELDS,
+            "fields[music-videos]": CATALOG_MUSIC_VIDEO_FIELDS,
+        },
+    },
+}
+API_CACHE_MAX_SIZE = 256 * 1024 * 1024
+API_CACHE_TTLS = {
+    "songs": 24 * 60 * 60,
+    "music-videos": 24 * 60 * 60,
+    "albums": 24 * 60 * 60,
+    "playlists": 60 * 60,
+    "artists": 24 * 60 * 60,
+}
 ITUNES_LOOKUP_API_URL = "https://itunes.apple.com/lookup"
 ITUNES_PAGE_API_URL = "https://music.apple.com"
 STOREFRONT_IDS = {
@@ -1,9 +1,21 @@
+import asyncio
 import logging
+import typing
 
 import httpx
 
-from ..utils import raise_for_status, safe_json
-from .constants import ITUNES_LOOKUP_API_URL, ITUNES_PAGE_API_URL, STOREFRONT_IDS
+from ..utils import SingleFlight, raise_for_status, safe_json
+from .constants import (
+    ITUNES_LOOKUP_API_URL,
+    ITUNES_LOOKUP_BATCH_SIZE,
+    ITUNES_LOOKUP_BATCH_WINDOW,
+    ITUNES_LOOKUP_ENTITY_WRAPPER_TYPES,
+    ITUNES_PAGE_API_URL,
+    RATE_LIMIT_RETRIES,
+    RATE_LIMITS,
+    STOREFRONT_IDS,
+)
+from .rate_limiter import create_rate_limiter, send_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +25,19 @@ class ItunesApi:
         self,
         storefront: str = "us",
         language: str = "en-US",
+        rate_limit_scale: float = 1.0,
     ) -> None:
         self.storefront = storefront
         self.language = language
+        self.rate_limit_scale = rate_limit_scale
+        self._single_flight = SingleFlight()
+        self._lookup_batches: dict[str, dict[str, asyncio.Future]] = {}
+        self._lookup_tasks: set[asyncio.Task] = set()
         self.initialize()
 
     def initialize(self) -> None:
         self._initialize_storefront_id()
+        self._initialize_rate_limiters()
         self._initialize_client()
 
     def _initialize_storefront_id(self) -> None:
@@ -28,6 +46,15 @@ class ItunesApi:
         except KeyError:
             raise Exception(f"No storefront id for {self.storefront}")
 
+    def _initialize_rate_limiters(self) -> None:
+        self.rate_limiters = {
+            family: create_rate_limiter(
+                **RATE_LIMITS[family],
+                scale=self.rate_limit_scale,
+            )
+            for family in ("itunes-lookup", "itunes-page")
+        }
+
     def _initialize_client(self) -> None:
         self.client = httpx.AsyncClient(
             params={
@@ -45,29 +72,126 @@ class ItunesApi:
         media_id: str,
         entity: str = "album",
     ) -> dict:
-        response = await self.client.get(
-            ITUNES_LOOKUP_API_URL,
-            params={
-                "id": media_id,
-                "entity": entity,
-            },
-        )
-        raise_for_status(response)
+        media_id = str(media_id)
+        lookup_batch = self._lookup_batches.setdefault(entity, {})
+        if not lookup_batch:
+            self._track_lookup_task(self._send_lookup_batch_later(entity))
+
+        future = lookup_batch.get(media_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            lookup_batch[media_id] = future
+        if len(lookup_batch) >= ITUNES_LOOKUP_BATCH_SIZE:
+            self._send_lookup_batch(entity)
 
-        lookup_result = safe_json(response)
-        if "results" not in lookup_result:
-            raise Exception("Error getting lookup result:", response.text)
+        lookup_result = {"results": await asyncio.shield(future)}
         logger.debug(f"Lookup result: {lookup_result}")
 
         return lookup_result
 
+    def _track_lookup_task(self, coroutine: typing.Coroutine) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._lookup_tasks.add(task)
+        task.add_done_callback(self._lookup_tasks.discard)
+
+    async def _send_lookup_batch_later(self, entity: str) -> None:
+        await asyncio.sleep(ITUNES_LOOKUP_BATCH_WINDOW)
+        self._send_lookup_batch(entity)
+
+    def _send_lookup_batch(self, entity: str) -> None:
+        lookup_batch = self._lookup_batches.pop(entity, None)
+        if lookup_batch:
+            self._track_lookup_task(self._get_lookup_batch(entity, lookup_batch))
+
+    async def _get_lookup_batch(
+        self,
+        entity: str,
+        lookup_batch: dict[str, asyncio.Future],
+    ) -> None:
+        try:
+            response = await send_rate_limited(
+                self.rate_limiters["itunes-lookup"],
+                lambda: self.client.get(
+                    ITUNES_LOOKUP_API_URL,
+                    params={
+                        "id": ",".join(lookup_batch),
+                        "entity": entity,
+                    },
+                ),
+                RATE_LIMIT_RETRIES,
+            )
+            raise_for_status(response)
+
+            lookup_result = safe_json(response)
+            if "results" not in lookup_result:
+                raise Exception("Error getting lookup result:", response.text)
+        except Exception as e:
+            for future in lookup_batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Looked up {len(lookup_batch)} ids in one request")
+        for media_id, future in lookup_batch.items():
+            if not future.done():
+                future.set_result(
+                    self._get_lookup_results(
+                        media_id,
+                        entity,
+                        lookup_result["results"],
+                    )
+                )
+
+    @staticmethod
+    def _get_lookup_result_id(result: dict) -> str:
+        return str(result.get(f"{result.get('wrapperType')}Id"))
+
+    def _get_lookup_results(
+        self,
+        media_id: str,
+        entity: str,
+        results: list[dict],
+    ) -> list[dict]:
+        primary_result = next(
+            (
+                result
+                for result in results
+                if self._get_lookup_result_id(result) == media_id
+            ),
+            None,
+        )
+        if primary_result is None:
+            return []
+
+        related_wrapper_type = ITUNES_LOOKUP_ENTITY_WRAPPER_TYPES.get(entity)
+        lookup_results = {
+            (primary_result["wrapperType"], media_id): primary_result,
+        }
+        for result in results:
+            if (
+                result.get("wrapperType") == related_wrapper_type
+                and result.get("collectionId") == primary_result.get("collectionId")
+            ):
+                lookup_results.setdefault(
+                    (related_wrapper_type, self._get_lookup_result_id(result)),
+                    result,
+                )
+        return list(lookup_results.values())
+
     async def get_itunes_page(
         self,
         media_type: str,
         media_id: str,
     ) -> dict:
-        response = await self.client.get(
-            f"{ITUNES_PAGE_API_URL}/{media_type}/{media_id}"
+        response = await self._single_flight.run(
+            ("page", media_type, media_id),
+            lambda: send_rate_limited(
+                self.rate_limiters["itunes-page"],
+                lambda: self.client.get(
+                    f"{ITUNES_PAGE_API_URL}/{media_type}/{media_id}"
+                ),
+                RATE_LIMIT_RETRIES,
+            ),
         )
         raise_for_status(response)
 
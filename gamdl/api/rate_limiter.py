@@ -0,0 +1,107 @@
+import asyncio
+import email.utils
+import logging
+import time
+import typing
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        min_rate: float = 0.5,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst,
+                    self.tokens + (now - self.updated) * self.rate,
+                )
+                self.updated = now
+
+                wait = self.blocked_until - now
+                if wait <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep(max(wait, (1 - self.tokens) / self.rate))
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: float | None) -> None:
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.tokens = 0.0
+        self.blocked_until = max(
+            self.blocked_until,
+            time.monotonic() + (retry_after if retry_after is not None else 1 / self.rate),
+        )
+
+
+def create_rate_limiter(rate: float, burst: int, scale: float = 1.0) -> RateLimiter:
+    rate *= scale
+    return RateLimiter(
+        rate=rate,
+        burst=max(1, round(burst * scale)),
+        min_rate=min(0.5, rate),
+    )
+
+
+def get_retry_after(response: httpx.Response) -> float | None:
+    retry_after = response.headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_date = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_date.timestamp() - time.time(), 0.0)
+
+
+async def send_rate_limited(
+    rate_limiter: RateLimiter,
+    send: typing.Callable[[], typing.Awaitable[httpx.Response]],
+    retries: int,
+) -> httpx.Response:
+    for attempt in range(retries + 1):
+        await rate_limiter.acquire()
+        response = await send()
+        if response.status_code != 429:
+            rate_limiter.on_success()
+            return response
+
+        retry_after = get_retry_after(response)
+        rate_limiter.on_throttle(retry_after)
+        logger.debug(
+            f"Rate limited on {response.request.url.host}, "
+            f"retrying after {retry_after or 1 / rate_limiter.rate:.2f}s "
+            f"at {rate_limiter.rate:.2f} requests/s"
+        )
+
+    return response
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from functools import wraps
 from pathlib import Path
 
@@ -16,8 +17,10 @@ from ..downloader import (
     AppleMusicMusicVideoDownloader,
     AppleMusicSongDownloader,
     AppleMusicUploadedVideoDownloader,
+    DecryptMode,
     DownloadItem,
     DownloadMode,
+    DownloadStage,
     GamdlError,
     RemuxMode,
 )
@@ -28,6 +31,7 @@ from ..interface import (
     AppleMusicUploadedVideoInterface,
     SongCodec,
 )
+from ..utils import close_http_clients, configure_http_clients
 from .cli_config import CliConfig
 from .config_file import ConfigFile
 from .constants import X_NOT_IN_PATH
@@ -39,11 +43,89 @@ logger = logging.getLogger(__name__)
 def make_sync(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        return asyncio.run(func(*args, **kwargs))
+        async def run():
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                await close_http_clients()
+
+        return asyncio.run(run())
 
     return wrapper
 
 
+async def download_queue_item(
+    downloader: AppleMusicDownloader,
+    download_item: DownloadItem,
+    download_index: int,
+    download_queue_length: int,
+    config: CliConfig,
+) -> int:
+    download_queue_progress = click.style(
+        f"[Track {download_index}/{download_queue_length}]",
+        dim=True,
+    )
+    media_title = (
+        download_item.media_metadata["attributes"]["name"]
+        if isinstance(
+            download_item,
+            DownloadItem,
+        )
+        else "Unknown Title"
+    )
+    logger.info(download_queue_progress + f' Downloading "{media_title}"')
+
+    for attempt in range(config.retries + 1):
+        try:
+            await downloader.download(
+                download_item,
+                keep_temp_on_error=attempt < config.retries,
+            )
+            break
+        except GamdlError as e:
+            downloader.cleanup(download_item)
+            logger.warning(download_queue_progress + f' Skipping "{media_title}": {e}')
+            break
+        except KeyboardInterrupt:
+            exit(1)
+        except Exception as e:
+            if isinstance(e, (httpx.TransportError, httpx.HTTPStatusError)):
+                retryable = not (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and e.response.status_code in {401, 403, 404}
+                )
+            else:
+                retryable = downloader.base_downloader.has_reached_stage(
+                    download_item,
+                    DownloadStage.DOWNLOADED,
+                )
+
+            if not retryable or attempt >= config.retries:
+                downloader.cleanup(download_item)
+                logger.error(
+                    download_queue_progress + f' Error downloading "{media_title}"',
+                    exc_info=not config.no_exceptions,
+                )
+                return 1
+
+            logger.warning(
+                download_queue_progress
+                + f' Error downloading "{media_title}", '
+                f"retrying ({attempt + 1}/{config.retries})"
+                + (
+                    f" from stage {download_item.stage.name}"
+                    if downloader.base_downloader.has_reached_stage(
+                        download_item,
+                        DownloadStage.DOWNLOADED,
+                    )
+                    else ""
+                )
+                + "..."
+            )
+
+    return 0
+
+
 @click.command()
 @click.help_option("-h", "--help")
 @click.version_option(__version__, "-v", "--version")
@@ -68,21 +150,39 @@ async def main(config: CliConfig):
 
     logger.info(f"Starting Gamdl {__version__}")
 
+    configure_http_clients(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry,
+        http2=config.http2,
+    )
+
     if config.use_wrapper:
         apple_music_api = await AppleMusicApi.create_from_wrapper(
             wrapper_account_url=config.wrapper_account_url,
             language=config.language,
+            developer_token_cache_path=config.developer_token_cache_path,
+            api_cache_path=config.api_cache_path,
+            pagination_concurrency=config.pagination_concurrency,
+            fields_profile=config.fields_profile,
+            rate_limit_scale=config.rate_limit_scale,
         )
     else:
         cookies_path = prompt_path(config.cookies_path)
         apple_music_api = await AppleMusicApi.create_from_netscape_cookies(
             cookies_path=cookies_path,
             language=config.language,
+            developer_token_cache_path=config.developer_token_cache_path,
+            api_cache_path=config.api_cache_path,
+            pagination_concurrency=config.pagination_concurrency,
+            fields_profile=config.fields_profile,
+            rate_limit_scale=config.rate_limit_scale,
         )
 
     itunes_api = ItunesApi(
         apple_music_api.storefront,
         apple_music_api.language,
+        rate_limit_scale=config.rate_limit_scale,
     )
 
     if not apple_music_api.active_subscription:
@@ -100,7 +200,12 @@ async def main(config: CliConfig):
     interface = AppleMusicInterface(
         apple_music_api,
         itunes_api,
+        key_store_path=config.key_store_path,
+        key_store_secret_path=config.key_store_secret_path,
     )
+    if config.purge_key_store and interface.key_store:
+        purged_count = interface.key_store.purge()
+        logger.info(f"Purged {purged_count} key(s) from the key store")
     song_interface = AppleMusicSongInterface(interface)
     music_video_interface = AppleMusicMusicVideoInterface(interface)
     uploaded_video_interface = AppleMusicUploadedVideoInterface(interface)
@@ -109,6 +214,7 @@ async def main(config: CliConfig):
         output_path=config.output_path,
         temp_path=config.temp_path,
         wvd_path=config.wvd_path,
+        cdm_session_pool_size=config.cdm_session_pool_size,
         overwrite=config.overwrite,
         save_cover=config.save_cover,
         save_playlist=config.save_playlist,
@@ -120,7 +226,11 @@ async def main(config: CliConfig):
         use_wrapper=config.use_wrapper,
         wrapper_decrypt_ip=config.wrapper_decrypt_ip,
         download_mode=config.download_mode,
+        segment_concurrency=config.segment_concurrency,
+        segment_retries=config.segment_retries,
+        decrypt_mode=config.decrypt_mode,
         remux_mode=config.remux_mode,
+        in_memory_staging=config.in_memory_staging,
         cover_format=config.cover_format,
         album_folder_template=config.album_folder_template,
         compilation_folder_template=config.compilation_folder_template,
@@ -135,6 +245,8 @@ async def main(config: CliConfig):
         truncate=config.truncate,
         remux_to_mp3=config.remux_to_mp3,
         mp3_bitrate=config.mp3_bitrate,
+        journal_path=config.journal_path,
+        resume=config.resume,
     )
     song_downloader = AppleMusicSongDownloader(
         base_downloader=base_downloader,
@@ -145,6 +257,7 @@ async def main(config: CliConfig):
         synced_lyrics_only=config.synced_lyrics_only,
         use_album_date=config.use_album_date,
         fetch_extra_tags=config.fetch_extra_tags,
+        catalog_tags=config.catalog_tags,
     )
     music_video_downloader = AppleMusicMusicVideoDownloader(
         base_downloader=base_downloader,
@@ -164,6 +277,9 @@ async def main(config: CliConfig):
         song_downloader=song_downloader,
         music_video_downloader=music_video_downloader,
         uploaded_video_downloader=uploaded_video_downloader,
+        download_queue_lookahead=config.download_queue_lookahead,
+        media_prefetch_depth=config.media_prefetch_depth,
+        library_index_path=config.library_index_path,
     )
 
     if not config.synced_lyrics_only:
@@ -181,9 +297,13 @@ async def main(config: CliConfig):
             logger.critical(X_NOT_IN_PATH.format("MP4Box", config.mp4box_path))
             return
 
-        if not base_downloader.full_mp4decrypt_path and (
-            config.song_codec not in (SongCodec.AAC_LEGACY, SongCodec.AAC_HE_LEGACY)
-            or config.remux_mode == RemuxMode.MP4BOX
+        if (
+            not base_downloader.full_mp4decrypt_path
+            and config.decrypt_mode == DecryptMode.MP4DECRYPT
+            and (
+                config.song_codec not in (SongCodec.AAC_LEGACY, SongCodec.AAC_HE_LEGACY)
+                or config.remux_mode == RemuxMode.MP4BOX
+            )
         ):
             logger.critical(X_NOT_IN_PATH.format("mp4decrypt", config.mp4decrypt_path))
             return
@@ -206,6 +326,19 @@ async def main(config: CliConfig):
                 "They're not guaranteed to work due to API limitations."
             )
 
+    if config.in_memory_staging and (
+        config.download_mode != DownloadMode.NATIVE
+        or config.decrypt_mode != DecryptMode.NATIVE
+    ):
+        logger.warning(
+            "In-memory staging always downloads and decrypts songs natively,"
+            " --download-mode and --decrypt-mode only apply to other media"
+        )
+
+    if config.resume and not base_downloader.journal:
+        logger.critical("--resume requires --journal-path")
+        return
+
     if config.read_urls_as_txt:
         urls_from_file = []
         for url in config.urls:
@@ -221,11 +354,23 @@ async def main(config: CliConfig):
     else:
         urls = config.urls
 
+    journal = base_downloader.journal
+
+    if config.rebuild_library_index and downloader.library_index:
+        indexed_count = downloader.rebuild_library_index()
+        logger.info(f"Indexed {indexed_count} media file(s) in the library index")
+
     error_count = 0
     for url_index, url in enumerate(urls, 1):
         url_progress = click.style(f"[URL {url_index}/{len(urls)}]", dim=True)
+        if journal and journal.resume and journal.is_url_finished(url):
+            logger.info(url_progress + f' Skipping "{url}", already finished')
+            continue
+
         logger.info(url_progress + f' Processing "{url}"')
-        download_queue = None
+        if journal:
+            journal.start_url(url)
+        media_queue = None
         try:
             url_info = downloader.get_url_info(url)
             if not url_info:
@@ -234,8 +379,8 @@ async def main(config: CliConfig):
                 )
                 continue
 
-            download_queue = await downloader.get_download_queue(url_info)
-            if not download_queue:
+            media_queue = await downloader.get_media_queue(url_info)
+            if not media_queue:
                 logger.warning(
                     url_progress
                     + f' No downloadable media found for "{url}", skipping.',
@@ -250,75 +395,68 @@ async def main(config: CliConfig):
                 exc_info=not config.no_exceptions,
             )
 
-        if not download_queue:
+        if not media_queue:
             continue
 
-        for download_index, download_item in enumerate(
-            download_queue,
-            1,
-        ):
-            download_queue_progress = click.style(
-                f"[Track {download_index}/{len(download_queue)}]",
-                dim=True,
-            )
-            media_title = (
-                download_item.media_metadata["attributes"]["name"]
-                if isinstance(
+        download_queue = asyncio.Queue(maxsize=config.max_concurrent_downloads)
+        worker_count = min(config.max_concurrent_downloads, len(media_queue))
+
+        async def download_producer() -> None:
+            start_time = time.perf_counter()
+            download_index = 0
+            async for download_item in downloader.iter_download_items(media_queue):
+                download_index += 1
+                if download_index == 1:
+                    logger.debug(
+                        f"First item resolved in {time.perf_counter() - start_time:.2f}s"
+                    )
+                await download_queue.put((download_index, download_item))
+
+        async def download_worker() -> int:
+            worker_error_count = 0
+            while (queue_entry := await download_queue.get()) is not None:
+                download_index, download_item = queue_entry
+                worker_error_count += await download_queue_item(
+                    downloader,
                     download_item,
-                    DownloadItem,
+                    download_index,
+                    len(media_queue),
+                    config,
                 )
-                else "Unknown Title"
+                if config.sleep > 0 and download_index < len(media_queue):
+                    await asyncio.sleep(config.sleep)
+            return worker_error_count
+
+        workers = [
+            asyncio.ensure_future(download_worker()) for _ in range(worker_count)
+        ]
+        producer_failed = False
+        try:
+            await download_producer()
+        except Exception:
+            producer_failed = True
+            error_count += 1
+            logger.error(
+                url_progress + f' Error processing "{url}"',
+                exc_info=not config.no_exceptions,
             )
-            logger.info(download_queue_progress + f' Downloading "{media_title}"')
-
-            for attempt in range(config.retries + 1):
-                try:
-                    await downloader.download(download_item)
-                    break
-                except GamdlError as e:
-                    logger.warning(
-                        download_queue_progress + f' Skipping "{media_title}": {e}'
-                    )
-                    break
-                except KeyboardInterrupt:
-                    exit(1)
-                except (httpx.TransportError, httpx.HTTPStatusError) as e:
-                    if (
-                        isinstance(e, httpx.HTTPStatusError)
-                        and e.response.status_code in {401, 403, 404}
-                    ):
-                        error_count += 1
-                        logger.error(
-                            download_queue_progress
-                            + f' Error downloading "{media_title}"',
-                            exc_info=not config.no_exceptions,
-                        )
-                        break
-
-                    if attempt < config.retries:
-                        logger.warning(
-                            download_queue_progress
-                            + f' Error downloading "{media_title}", '
-                            f"retrying ({attempt + 1}/{config.retries})..."
-                        )
-                        continue
-                    else:
-                        error_count += 1
-                        logger.error(
-                            download_queue_progress
-                            + f' Error downloading "{media_title}"',
-                            exc_info=not config.no_exceptions,
-                        )
-                        break
-                except Exception as e:
-                    error_count += 1
-                    logger.error(
-                        download_queue_progress + f' Error downloading "{media_title}"',
-                        exc_info=not config.no_exceptions,
-                    )
-                    break
-
-            if config.sleep > 0 and download_index < len(download_queue):
-                await asyncio.sleep(config.sleep)
+        finally:
+            for _ in range(worker_count):
+                await download_queue.put(None)
+
+        worker_error_counts = await asyncio.gather(*workers)
+        error_count += sum(worker_error_counts)
+        if journal and not sum(worker_error_counts) and not producer_failed:
+            journal.finish_url(url)
+
+    if apple_music_api.cache:
+        apple_music_api.cache.close()
+    if interface.key_store:
+        interface.key_store.close()
+    base_downloader.cdm_session_pool.close()
+    if downloader.library_index:
+        downloader.library_index.close()
+    if journal:
+        journal.close()
 
     logger.info(f"Finished with {error_count} error(s)")
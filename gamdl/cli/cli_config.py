@@ -7,16 +7,20 @@ import click
 from dataclass_click import argument, option
 
 from ..api import AppleMusicApi
+from ..api.constants import CATALOG_FIELDS_PROFILES
 from ..downloader import (
+    AppleMusicDownloader,
     AppleMusicBaseDownloader,
     AppleMusicMusicVideoDownloader,
     AppleMusicSongDownloader,
     AppleMusicUploadedVideoDownloader,
+    DecryptMode,
     DownloadMode,
     RemuxFormatMusicVideo,
     RemuxMode,
 )
 from ..interface import (
+    AppleMusicInterface,
     CoverFormat,
     MusicVideoCodec,
     MusicVideoResolution,
@@ -24,17 +28,21 @@ from ..interface import (
     SyncedLyricsFormat,
     UploadedVideoQuality,
 )
+from ..utils import configure_http_clients
 from .utils import Csv
 
 api_from_cookies_sig = inspect.signature(AppleMusicApi.create_from_netscape_cookies)
 api_from_wrapper_sig = inspect.signature(AppleMusicApi.create_from_wrapper)
 api_sig = inspect.signature(AppleMusicApi.__init__)
+downloader_sig = inspect.signature(AppleMusicDownloader.__init__)
+interface_sig = inspect.signature(AppleMusicInterface.__init__)
 base_downloader_sig = inspect.signature(AppleMusicBaseDownloader.__init__)
 music_video_downloader_sig = inspect.signature(AppleMusicMusicVideoDownloader.__init__)
 song_downloader_sig = inspect.signature(AppleMusicSongDownloader.__init__)
 uploaded_video_downloader_sig = inspect.signature(
     AppleMusicUploadedVideoDownloader.__init__
 )
+http_clients_sig = inspect.signature(configure_http_clients)
 
 
 @dataclass
@@ -136,6 +144,133 @@ class CliConfig:
             default=api_sig.parameters["language"].default,
         ),
     ]
+    developer_token_cache_path: Annotated[
+        str,
+        option(
+            "--developer-token-cache-path",
+            help="Developer token cache file path",
+            default=api_sig.parameters["developer_token_cache_path"].default,
+            type=click.Path(
+                file_okay=True,
+                dir_okay=False,
+                writable=True,
+                resolve_path=True,
+            ),
+        ),
+    ]
+    pagination_concurrency: Annotated[
+        int,
+        option(
+            "--pagination-concurrency",
+            help="Number of collection pages fetched concurrently",
+            default=api_sig.parameters["pagination_concurrency"].default,
+            type=click.IntRange(min=1),
+        ),
+    ]
+    fields_profile: Annotated[
+        str,
+        option(
+            "--fields-profile",
+            help="Catalog fields profile",
+            default=api_sig.parameters["fields_profile"].default,
+            type=click.Choice(list(CATALOG_FIELDS_PROFILES)),
+        ),
+    ]
+    rate_limit_scale: Annotated[
+        float,
+        option(
+            "--rate-limit-scale",
+            help="Multiplier for the API request rate limits",
+            default=api_sig.parameters["rate_limit_scale"].default,
+            type=click.FloatRange(min=0, min_open=True),
+        ),
+    ]
+    api_cache_path: Annotated[
+        str,
+        option(
+            "--api-cache-path",
+            help="Catalog API response cache file path",
+            default=api_sig.parameters["api_cache_path"].default,
+            type=click.Path(
+                file_okay=True,
+                dir_okay=False,
+                writable=True,
+                resolve_path=True,
+            ),
+        ),
+    ]
+    key_store_path: Annotated[
+        str,
+        option(
+            "--key-store-path",
+            help="Encrypted decryption key store file path",
+            default=interface_sig.parameters["key_store_path"].default,
+            type=click.Path(
+                file_okay=True,
+                dir_okay=False,
+                writable=True,
+                resolve_path=True,
+            ),
+        ),
+    ]
+    key_store_secret_path: Annotated[
+        str,
+        option(
+            "--key-store-secret-path",
+            help="Decryption key store secret file path",
+            default=interface_sig.parameters["key_store_secret_path"].default,
+            type=click.Path(
+                file_okay=True,
+                dir_okay=False,
+                writable=True,
+                resolve_path=True,
+            ),
+        ),
+    ]
+    purge_key_store: Annotated[
+        bool,
+        option(
+            "--purge-key-store",
+            help="Remove all entries from the decryption key store",
+            is_flag=True,
+        ),
+    ]
+    # HTTP client specific options
+    max_connections: Annotated[
+        int,
+        option(
+            "--max-connections",
+            help="Maximum number of pooled HTTP connections",
+            default=http_clients_sig.parameters["max_connections"].default,
+            type=click.IntRange(min=1),
+        ),
+    ]
+    max_keepalive_connections: Annotated[
+        int,
+        option(
+            "--max-keepalive-connections",
+            help="Maximum number of idle HTTP connections kept alive",
+            default=http_clients_sig.parameters["max_keepalive_connections"].default,
+            type=click.IntRange(min=1),
+        ),
+    ]
+    keepalive_expiry: Annotated[
+        float,
+        option(
+            "--keepalive-expiry",
+            help="Seconds to keep idle HTTP connections alive",
+            default=http_clients_sig.parameters["keepalive_expiry"].default,
+            type=click.FloatRange(min=0),
+        ),
+    ]
+    http2: Annotated[
+        bool,
+        option(
+            "--http2",
+            help="Use HTTP/2 for media requests (requires h2)",
+            is_flag=True,
+        ),
+    ]
     # Base Downloader specific options
     output_path: Annotated[
         str,
@@ -167,6 +302,28 @@ class CliConfig:
             ),
         ),
     ]
+    journal_path: Annotated[
+        str,
+        option(
+            "--journal-path",
+            help="Batch journal file path",
+            default=base_downloader_sig.parameters["journal_path"].default,
+            type=click.Path(
+                file_okay=True,
+                dir_okay=False,
+                writable=True,
+                resolve_path=True,
+            ),
+        ),
+    ]
+    resume: Annotated[
+        bool,
+        option(
+            "--resume",
+            help="Resume the batch recorded in the journal",
+            is_flag=True,
+        ),
+    ]
     wvd_path: Annotated[
         str,
         option(
@@ -181,6 +338,15 @@ class CliConfig:
             ),
         ),
     ]
+    cdm_session_pool_size: Annotated[
+        int,
+        option(
+            "--cdm-session-pool-size",
+            help="Number of CDM sessions used for concurrent license exchanges",
+            default=base_downloader_sig.parameters["cdm_session_pool_size"].default,
+            type=click.IntRange(min=1),
+        ),
+    ]
     overwrite: Annotated[
         bool,
         option(
@@ -271,6 +437,33 @@ class CliConfig:
             type=DownloadMode,
         ),
     ]
+    segment_concurrency: Annotated[
+        int,
+        option(
+            "--segment-concurrency",
+            help="Number of segments fetched concurrently in native download mode",
+            default=base_downloader_sig.parameters["segment_concurrency"].default,
+            type=click.IntRange(min=1),
+        ),
+    ]
+    segment_retries: Annotated[
+        int,
+        option(
+            "--segment-retries",
+            help="Number of retries per segment in native download mode",
+            default=base_downloader_sig.parameters["segment_retries"].default,
+            type=click.IntRange(min=0),
+        ),
+    ]
+    decrypt_mode: Annotated[
+        DecryptMode,
+        option(
+            "--decrypt-mode",
+            help="Decrypt mode",
+            default=base_downloader_sig.parameters["decrypt_mode"].default,
+            type=DecryptMode,
+        ),
+    ]
     remux_mode: Annotated[
         RemuxMode,
         option(
@@ -280,6 +473,14 @@ class CliConfig:
             type=RemuxMode,
         ),
     ]
+    in_memory_staging: Annotated[
+        bool,
+        option(
+            "--in-memory-staging",
+            help="Download, decrypt, remux and tag songs in memory",
+            is_flag=True,
+        ),
+    ]
     cover_format: Annotated[
         CoverFormat,
         option(
@@ -431,6 +632,14 @@ class CliConfig:
             is_flag=True,
         ),
     ]
+    catalog_tags: Annotated[
+        bool,
+        option(
+            "--catalog-tags",
+            help="Build song tags from catalog metadata instead of webplayback",
+            is_flag=True,
+        ),
+    ]
     # DownloaderMusicVideo specific options
     music_video_codec_priority: Annotated[
         list[MusicVideoCodec],
@@ -494,6 +703,55 @@ class CliConfig:
             default=3,
         ),
     ]
+    max_concurrent_downloads: Annotated[
+        int,
+        option(
+            "--max-concurrent-downloads",
+            help="Maximum number of items to download concurrently",
+            default=1,
+            type=click.IntRange(min=1),
+        ),
+    ]
+    download_queue_lookahead: Annotated[
+        int,
+        option(
+            "--download-queue-lookahead",
+            help="Number of items resolved ahead of the download queue",
+            default=downloader_sig.parameters["download_queue_lookahead"].default,
+            type=click.IntRange(min=1),
+        ),
+    ]
+    media_prefetch_depth: Annotated[
+        int,
+        option(
+            "--media-prefetch-depth",
+            help="Number of items whose streams and keys are resolved ahead of the download queue",
+            default=downloader_sig.parameters["media_prefetch_depth"].default,
+            type=click.IntRange(min=0),
+        ),
+    ]
+    library_index_path: Annotated[
+        str,
+        option(
+            "--library-index-path",
+            help="Downloaded media index file path",
+            default=downloader_sig.parameters["library_index_path"].default,
+            type=click.Path(
+                file_okay=True,
+                dir_okay=False,
+                writable=True,
+                resolve_path=True,
+            ),
+        ),
+    ]
+    rebuild_library_index: Annotated[
+        bool,
+        option(
+            "--rebuild-library-index",
+            help="Rebuild the downloaded media index by scanning the output directory",
+            is_flag=True,
+        ),
+    ]
     remux_to_mp3: Annotated[
         bool,
         option(
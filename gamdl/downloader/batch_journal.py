@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from .enums import DownloadStage
+from .types import DownloadItem
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJournal:
+    def __init__(
+        self,
+        journal_path: str,
+        resume: bool = False,
+    ) -> None:
+        self.journal_path = journal_path
+        self.resume = resume
+        self.urls = {}
+        self.items = {}
+        self.current_url = None
+        self.initialize()
+
+    def initialize(self) -> None:
+        journal_path = Path(self.journal_path)
+        journal_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.resume and journal_path.exists():
+            self._replay(journal_path)
+        self.journal_file = open(
+            journal_path,
+            "a" if self.resume else "w",
+            encoding="utf-8",
+        )
+
+    def _replay(self, journal_path: Path) -> None:
+        with open(journal_path, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug("Skipping truncated journal record")
+                    continue
+
+                if record["type"] == "url":
+                    self.urls[record["url"]] = record["state"]
+                else:
+                    self.items[(record["url"], record["media_id"])] = record
+
+        logger.debug(
+            f"Replayed journal with {len(self.urls)} URL(s) "
+            f"and {len(self.items)} item(s)"
+        )
+
+    def _write(self, record: dict) -> None:
+        self.journal_file.write(json.dumps(record) + "\n")
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+
+    def start_url(self, url: str) -> None:
+        self.current_url = url
+        self.urls[url] = "started"
+        self._write({"type": "url", "url": url, "state": "started"})
+
+    def finish_url(self, url: str) -> None:
+        self.urls[url] = "finished"
+        self._write({"type": "url", "url": url, "state": "finished"})
+
+    def is_url_finished(self, url: str) -> bool:
+        return self.urls.get(url) == "finished"
+
+    def get_item(self, media_id: str) -> dict | None:
+        return self.items.get((self.current_url, media_id))
+
+    def update_stage(
+        self,
+        download_item: DownloadItem,
+        stage: DownloadStage,
+    ) -> None:
+        record = {
+            "type": "item",
+            "url": self.current_url,
+            "media_id": download_item.media_metadata["id"],
+            "stage": stage.name,
+            "random_uuid": download_item.random_uuid,
+            "staged_path": download_item.staged_path,
+            "final_path": download_item.final_path,
+            "time": time.time(),
+        }
+        self.items[(self.current_url, record["media_id"])] = record
+        self._write(record)
+
+    def close(self) -> None:
+        self.journal_file.close()
@@ -2,6 +2,8 @@ import re
 
 DEFAULT_SONG_DECRYPTION_KEY = "32b8ade1769e26b1ffb8986352793fc6"
 TEMP_PATH_TEMPLATE = "gamdl_temp_{}"
+LIBRARY_INDEX_KEY_TAG = "----:com.apple.iTunes:GAMDL_LIBRARY_INDEX_KEY"
+MP3_BITRATE_MAP = {"low": "128k", "mid": "160k", "high": "192k", "best": "320k"}
 ILLEGAL_CHARS_RE = r'[\\/:*?"<>|;]'
 ILLEGAL_CHAR_REPLACEMENT = "_"
 
@@ -1,15 +1,22 @@
 import asyncio
+import collections
+import hashlib
+import json
+import logging
+import time
 import typing
 from pathlib import Path
 
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
+from mutagen.mp4 import MP4
 
 from ..interface import AppleMusicInterface
-from ..utils import safe_gather
+from ..utils import iter_ordered, safe_gather
 from .constants import (
     ALBUM_MEDIA_TYPE,
     ARTIST_MEDIA_TYPE,
+    LIBRARY_INDEX_KEY_TAG,
     MUSIC_VIDEO_MEDIA_TYPE,
     PLAYLIST_MEDIA_TYPE,
     SONG_MEDIA_TYPE,
@@ -20,7 +27,7 @@ from .downloader_base import AppleMusicBaseDownloader
 from .downloader_music_video import AppleMusicMusicVideoDownloader
 from .downloader_song import AppleMusicSongDownloader
 from .downloader_uploaded_video import AppleMusicUploadedVideoDownloader
-from .enums import DownloadMode, RemuxMode
+from .enums import DecryptMode, DownloadMode, DownloadStage, RemuxMode
 from .exceptions import (
     ExecutableNotFound,
     FormatNotAvailable,
@@ -29,7 +36,10 @@ from .exceptions import (
     SyncedLyricsOnly,
     UnsupportedMediaType,
 )
-from .types import DownloadItem, UrlInfo
+from .library_index import LibraryIndex
+from .types import DownloadItem, MediaQueueItem, UrlInfo
+
+logger = logging.getLogger(__name__)
 
 
 class AppleMusicDownloader:
@@ -56,6 +66,9 @@ class AppleMusicDownloader:
         skip_music_videos: bool = False,
         skip_processing: bool = False,
         flat_filter: typing.Callable = None,
+        download_queue_lookahead: int = 8,
+        media_prefetch_depth: int = 2,
+        library_index_path: str | None = None,
     ):
         self.interface = interface
         self.base_downloader = base_downloader
@@ -65,6 +78,40 @@ class AppleMusicDownloader:
         self.skip_music_videos = skip_music_videos
         self.skip_processing = skip_processing
         self.flat_filter = flat_filter
+        self.download_queue_lookahead = download_queue_lookahead
+        self.media_prefetch_depth = media_prefetch_depth
+        self.library_index_path = library_index_path
+
+        self.initialize()
+
+    def initialize(self) -> None:
+        self._initialize_library_index()
+
+    def _initialize_library_index(self) -> None:
+        self.library_index = (
+            LibraryIndex(self.library_index_path) if self.library_index_path else None
+        )
+
+        naming_templates = [
+            self.base_downloader.album_folder_template,
+            self.base_downloader.compilation_folder_template,
+            self.base_downloader.no_album_folder_template,
+            self.base_downloader.single_disc_file_template,
+            self.base_downloader.multi_disc_file_template,
+            self.base_downloader.no_album_file_template,
+        ]
+        self.library_index_template_hash = hashlib.sha256(
+            json.dumps(
+                [
+                    str(Path(self.base_downloader.output_path).resolve()),
+                    self.base_downloader.truncate,
+                    *naming_templates,
+                ]
+            ).encode()
+        ).hexdigest()
+        self.library_index_playlist_scoped = any(
+            "{playlist_" in template for template in naming_templates
+        )
 
     async def get_single_download_item(
         self,
@@ -99,6 +146,16 @@ class AppleMusicDownloader:
             ):
                 raise NotStreamable(media_metadata["id"])
 
+            existing_download_item = self.get_indexed_download_item(
+                media_metadata,
+                playlist_metadata,
+            ) or self.get_journaled_download_item(
+                media_metadata,
+                playlist_metadata,
+            )
+            if existing_download_item:
+                return existing_download_item
+
             if media_metadata["type"] in SONG_MEDIA_TYPE:
                 if not self.song_downloader:
                     raise UnsupportedMediaType(media_metadata["type"])
@@ -133,20 +190,22 @@ class AppleMusicDownloader:
 
         return download_item
 
-    async def get_collection_download_items(
+    async def get_collection_media_queue(
         self,
         collection_metadata: dict,
-    ) -> list[DownloadItem]:
+    ) -> list[MediaQueueItem]:
         tracks_metadata = collection_metadata["relationships"]["tracks"]["data"]
         async for extended_data in self.interface.apple_music_api.extend_api_data(
             collection_metadata["relationships"]["tracks"],
         ):
             tracks_metadata.extend(extended_data["data"])
 
-        tasks = [
-            self.get_single_download_item(
-                media_metadata,
-                (
+        await self.song_downloader.interface.hydrate_lyrics(tracks_metadata)
+
+        return [
+            MediaQueueItem(
+                media_metadata=media_metadata,
+                playlist_metadata=(
                     collection_metadata
                     if collection_metadata["type"] in PLAYLIST_MEDIA_TYPE
                     else None
@@ -155,13 +214,18 @@ class AppleMusicDownloader:
             for media_metadata in tracks_metadata
         ]
 
-        download_items = await safe_gather(*tasks)
-        return download_items
+    async def get_collection_download_items(
+        self,
+        collection_metadata: dict,
+    ) -> list[DownloadItem]:
+        return await self.get_download_items(
+            await self.get_collection_media_queue(collection_metadata)
+        )
 
-    async def get_artist_download_items(
+    async def get_artist_media_queue(
         self,
         artist_metadata: dict,
-    ) -> list[DownloadItem]:
+    ) -> list[MediaQueueItem]:
         for relationship in artist_metadata["relationships"].keys():
             artist_metadata["relationships"][relationship]["data"].extend(
                 [
@@ -191,18 +255,18 @@ class AppleMusicDownloader:
         ).execute_async()
 
         if media_type == "albums":
-            return await self.get_artist_albums_download_items(
+            return await self.get_artist_albums_media_queue(
                 artist_metadata["relationships"]["albums"]["data"]
             )
         if media_type == "music-videos":
-            return await self.get_artist_music_videos_download_items(
+            return await self.get_artist_music_videos_media_queue(
                 artist_metadata["relationships"]["music-videos"]["data"]
             )
 
-    async def get_artist_albums_download_items(
+    async def get_artist_albums_media_queue(
         self,
         albums_metadata: list[dict],
-    ) -> list[DownloadItem]:
+    ) -> list[MediaQueueItem]:
         choices = [
             Choice(
                 name=" | ".join(
@@ -224,7 +288,7 @@ class AppleMusicDownloader:
             multiselect=True,
         ).execute_async()
 
-        download_items = []
+        media_queue = []
 
         album_tasks = [
             self.interface.apple_music_api.get_album(album_metadata["id"])
@@ -232,21 +296,21 @@ class AppleMusicDownloader:
         ]
         album_responses = await safe_gather(*album_tasks)
 
-        track_tasks = [
-            self.get_collection_download_items(album_response["data"][0])
+        collection_tasks = [
+            self.get_collection_media_queue(album_response["data"][0])
             for album_response in album_responses
         ]
-        track_results = await safe_gather(*track_tasks)
+        collection_results = await safe_gather(*collection_tasks)
 
-        for track_result in track_results:
-            download_items.extend(track_result)
+        for collection_result in collection_results:
+            media_queue.extend(collection_result)
 
-        return download_items
+        return media_queue
 
-    async def get_artist_music_videos_download_items(
+    async def get_artist_music_videos_media_queue(
         self,
         music_videos_metadata: list[dict],
-    ) -> list[DownloadItem]:
+    ) -> list[MediaQueueItem]:
         choices = [
             Choice(
                 name=" | ".join(
@@ -269,15 +333,10 @@ class AppleMusicDownloader:
             multiselect=True,
         ).execute_async()
 
-        music_video_tasks = [
-            self.get_single_download_item(
-                music_video_metadata,
-            )
+        return [
+            MediaQueueItem(media_metadata=music_video_metadata)
             for music_video_metadata in selected
         ]
-        download_items = await safe_gather(*music_video_tasks)
-
-        return download_items
 
     def millis_to_min_sec(self, millis) -> str:
         minutes, seconds = divmod(millis // 1000, 60)
@@ -292,23 +351,136 @@ class AppleMusicDownloader:
             **match.groupdict(),
         )
 
+    async def get_download_items(
+        self,
+        media_queue: list[MediaQueueItem],
+    ) -> list[DownloadItem]:
+        return await safe_gather(
+            *(
+                self.get_single_download_item(
+                    media_queue_item.media_metadata,
+                    media_queue_item.playlist_metadata,
+                )
+                for media_queue_item in media_queue
+            )
+        )
+
+    async def iter_download_items(
+        self,
+        media_queue: list[MediaQueueItem],
+    ) -> typing.AsyncGenerator[DownloadItem, None]:
+        pending = collections.deque()
+        try:
+            async for download_item in iter_ordered(
+                (
+                    self.get_single_download_item(
+                        media_queue_item.media_metadata,
+                        media_queue_item.playlist_metadata,
+                    )
+                    for media_queue_item in media_queue
+                ),
+                self.download_queue_lookahead,
+            ):
+                pending.append(
+                    asyncio.ensure_future(self.resolve_media(download_item))
+                )
+                if len(pending) > self.media_prefetch_depth:
+                    yield await pending.popleft()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def resume_download_item(self, download_item: DownloadItem) -> bool:
+        journal = self.base_downloader.journal
+        if not journal or not journal.resume or self.skip_processing:
+            return False
+
+        journal_item = journal.get_item(download_item.media_metadata["id"])
+        if (
+            not journal_item
+            or journal_item["stage"]
+            not in {DownloadStage.STAGED.name, DownloadStage.TAGGED.name}
+            or not journal_item["staged_path"]
+            or not Path(journal_item["staged_path"]).exists()
+        ):
+            return False
+
+        download_item.random_uuid = journal_item["random_uuid"]
+        download_item.staged_path = journal_item["staged_path"]
+        download_item.stage = DownloadStage[journal_item["stage"]]
+        download_item.media_resolved = True
+        logger.debug(
+            f"Resuming {download_item.media_metadata['id']} "
+            f"from stage {download_item.stage.name}"
+        )
+
+        return True
+
+    async def resolve_media(
+        self,
+        download_item: DownloadItem,
+    ) -> DownloadItem:
+        if (
+            download_item.media_resolved
+            or download_item.error
+            or download_item.flat_filter_result
+            or self.get_existing_path(download_item)
+        ):
+            return download_item
+
+        if self.resume_download_item(download_item):
+            return download_item
+
+        start_time = time.perf_counter()
+        try:
+            if download_item.media_metadata["type"] in SONG_MEDIA_TYPE:
+                await self.song_downloader.resolve_media(download_item)
+
+            if download_item.media_metadata["type"] in MUSIC_VIDEO_MEDIA_TYPE:
+                await self.music_video_downloader.resolve_media(download_item)
+
+            download_item.media_resolved = True
+            self.base_downloader.update_stage(download_item, DownloadStage.RESOLVED)
+        except Exception as e:
+            download_item.error = e
+
+        logger.debug(
+            f"Resolved media {download_item.media_metadata['id']} in "
+            f"{time.perf_counter() - start_time:.2f}s"
+        )
+
+        return download_item
+
     async def get_download_queue(
         self,
         url_info: UrlInfo,
     ) -> list[DownloadItem] | None:
-        return await self._get_download_queue(
+        media_queue = await self.get_media_queue(url_info)
+        if media_queue is None:
+            return None
+
+        return await self.get_download_items(media_queue)
+
+    async def get_media_queue(
+        self,
+        url_info: UrlInfo,
+    ) -> list[MediaQueueItem] | None:
+        return await self._get_media_queue(
             "song" if url_info.sub_id else url_info.type or url_info.library_type,
             url_info.sub_id or url_info.id or url_info.library_id,
             url_info.library_id is not None,
         )
 
-    async def _get_download_queue(
+    async def _get_media_queue(
         self,
         url_type: str,
         id: str,
         is_library: bool,
-    ) -> list[DownloadItem] | None:
-        download_items = []
+    ) -> list[MediaQueueItem] | None:
+        media_queue = []
 
         if url_type in ARTIST_MEDIA_TYPE:
             artist_response = await self.interface.apple_music_api.get_artist(
@@ -318,7 +490,7 @@ class AppleMusicDownloader:
             if artist_response is None:
                 return None
 
-            download_items = await self.get_artist_download_items(
+            media_queue = await self.get_artist_media_queue(
                 artist_response["data"][0],
             )
 
@@ -328,9 +500,7 @@ class AppleMusicDownloader:
             if song_respose is None:
                 return None
 
-            download_items.append(
-                await self.get_single_download_item(song_respose["data"][0])
-            )
+            media_queue.append(MediaQueueItem(media_metadata=song_respose["data"][0]))
 
         if url_type in ALBUM_MEDIA_TYPE:
             if is_library:
@@ -343,7 +513,7 @@ class AppleMusicDownloader:
             if album_response is None:
                 return None
 
-            download_items = await self.get_collection_download_items(
+            media_queue = await self.get_collection_media_queue(
                 album_response["data"][0],
             )
 
@@ -360,7 +530,7 @@ class AppleMusicDownloader:
             if playlist_response is None:
                 return None
 
-            download_items = await self.get_collection_download_items(
+            media_queue = await self.get_collection_media_queue(
                 playlist_response["data"][0],
             )
 
@@ -372,8 +542,8 @@ class AppleMusicDownloader:
             if music_video_response is None:
                 return None
 
-            download_items.append(
-                await self.get_single_download_item(music_video_response["data"][0])
+            media_queue.append(
+                MediaQueueItem(media_metadata=music_video_response["data"][0])
             )
 
         if url_type in UPLOADED_VIDEO_MEDIA_TYPE:
@@ -382,16 +552,17 @@ class AppleMusicDownloader:
             if uploaded_video is None:
                 return None
 
-            download_items.append(
-                await self.get_single_download_item(uploaded_video["data"][0])
-            )
+            media_queue.append(MediaQueueItem(media_metadata=uploaded_video["data"][0]))
 
-        return download_items
+        return media_queue
 
     async def download(
         self,
         download_item: DownloadItem,
+        keep_temp_on_error: bool = False,
     ) -> DownloadItem:
+        keep_temp = False
+        retry_item = download_item
         try:
             if download_item.flat_filter_result:
                 download_item = await self.get_single_download_item_no_filter(
@@ -402,14 +573,43 @@ class AppleMusicDownloader:
             if download_item.error:
                 raise download_item.error
 
+            await self.resolve_media(download_item)
+            if download_item.error:
+                raise download_item.error
+
+            self.base_downloader.restore_checkpoint(download_item)
+
             await self._initial_processing(download_item)
             await self._download(download_item)
             await self._final_processing(download_item)
 
             return download_item
+        except (asyncio.CancelledError, KeyboardInterrupt):
+            if self.base_downloader.journal:
+                keep_temp = True
+            raise
+        except Exception:
+            if (
+                keep_temp_on_error
+                and download_item is retry_item
+                and self.base_downloader.has_reached_stage(
+                    download_item,
+                    DownloadStage.DOWNLOADED,
+                )
+            ):
+                keep_temp = True
+            raise
         finally:
-            if isinstance(download_item, DownloadItem) and not self.skip_processing:
-                self.base_downloader.cleanup_temp(download_item.random_uuid)
+            if not keep_temp:
+                self.cleanup(download_item)
+
+    def cleanup(self, download_item: DownloadItem) -> None:
+        if (
+            isinstance(download_item, DownloadItem)
+            and download_item.random_uuid
+            and not self.skip_processing
+        ):
+            self.base_downloader.cleanup_temp(download_item.random_uuid)
 
     async def _download(
         self,
@@ -424,16 +624,12 @@ class AppleMusicDownloader:
         if self.song_downloader.synced_lyrics_only:
             return
 
-        if not self.base_downloader.overwrite:
-            if Path(download_item.final_path).exists():
-                raise MediaFileExists(download_item.final_path)
-
-            if download_item.media_metadata["type"] in SONG_MEDIA_TYPE:
-                for ext in self.AUDIO_EXTENSIONS:
-                    if Path(download_item.final_path).with_suffix(ext).exists():
-                        raise MediaFileExists(
-                            str(Path(download_item.final_path).with_suffix(ext))
-                        )
+        existing_path = self.get_existing_path(download_item)
+        if existing_path:
+            self.update_library_index(download_item, existing_path)
+            download_item.final_path = existing_path
+            self.base_downloader.update_stage(download_item, DownloadStage.FINAL)
+            raise MediaFileExists(existing_path)
 
         if download_item.media_metadata["type"] in {
             *SONG_MEDIA_TYPE,
@@ -452,12 +648,16 @@ class AppleMusicDownloader:
                 raise ExecutableNotFound("MP4Box")
 
             if (
-                self.song_downloader.use_wrapper
-                or (
-                    download_item.media_metadata["type"] in MUSIC_VIDEO_MEDIA_TYPE
-                    or self.base_downloader.remux_mode == RemuxMode.MP4BOX
+                (
+                    self.song_downloader.use_wrapper
+                    or (
+                        download_item.media_metadata["type"] in MUSIC_VIDEO_MEDIA_TYPE
+                        or self.base_downloader.remux_mode == RemuxMode.MP4BOX
+                    )
                 )
-            ) and not self.base_downloader.full_mp4decrypt_path:
+                and self.base_downloader.decrypt_mode == DecryptMode.MP4DECRYPT
+                and not self.base_downloader.full_mp4decrypt_path
+            ):
                 raise ExecutableNotFound("mp4decrypt")
 
             if (
@@ -472,7 +672,10 @@ class AppleMusicDownloader:
             ):
                 raise ExecutableNotFound("N_m3u8DL-RE")
 
-            if (
+            if not self.base_downloader.has_reached_stage(
+                download_item,
+                DownloadStage.STAGED,
+            ) and (
                 not download_item.stream_info
                 or not download_item.stream_info.audio_track
                 or not download_item.stream_info.audio_track.stream_url
@@ -487,6 +690,8 @@ class AppleMusicDownloader:
             ):
                 raise FormatNotAvailable(download_item.media_metadata["id"])
 
+        self.add_library_index_key_tag(download_item)
+
         if download_item.media_metadata["type"] in SONG_MEDIA_TYPE:
             await self.song_downloader.download(download_item)
 
@@ -496,6 +701,229 @@ class AppleMusicDownloader:
         if download_item.media_metadata["type"] in UPLOADED_VIDEO_MEDIA_TYPE:
             await self.uploaded_video_downloader.download(download_item)
 
+    def get_library_index_variant(self, media_type: str) -> str | None:
+        if media_type in SONG_MEDIA_TYPE and self.song_downloader:
+            return self.song_downloader.codec.value + (
+                "-mp3" if self.base_downloader.remux_to_mp3 else ""
+            )
+        if media_type in MUSIC_VIDEO_MEDIA_TYPE and self.music_video_downloader:
+            return f"music-video-{self.music_video_downloader.remux_format.value}"
+        if media_type in UPLOADED_VIDEO_MEDIA_TYPE and self.uploaded_video_downloader:
+            return f"uploaded-video-{self.uploaded_video_downloader.quality.value}"
+        return None
+
+    def get_library_index_key(
+        self,
+        media_metadata: dict,
+        playlist_metadata: dict = None,
+    ) -> tuple[str, str, str, str] | None:
+        variant = self.get_library_index_variant(media_metadata["type"])
+        if variant is None:
+            return None
+
+        return (
+            self.interface.get_media_id_of_library_media(media_metadata),
+            variant,
+            self.library_index_template_hash,
+            (
+                playlist_metadata["id"]
+                if playlist_metadata and self.library_index_playlist_scoped
+                else ""
+            ),
+        )
+
+    def get_indexed_download_item(
+        self,
+        media_metadata: dict,
+        playlist_metadata: dict = None,
+    ) -> DownloadItem | None:
+        if (
+            not self.library_index
+            or self.base_downloader.overwrite
+            or self.song_downloader.synced_lyrics_only
+        ):
+            return None
+
+        library_index_key = self.get_library_index_key(
+            media_metadata,
+            playlist_metadata,
+        )
+        if library_index_key is None:
+            return None
+
+        indexed_path = self.library_index.get(*library_index_key)
+        if indexed_path is None:
+            return None
+
+        return self.get_existing_download_item(
+            media_metadata,
+            playlist_metadata,
+            indexed_path,
+        )
+
+    def get_journaled_download_item(
+        self,
+        media_metadata: dict,
+        playlist_metadata: dict = None,
+    ) -> DownloadItem | None:
+        journal = self.base_downloader.journal
+        if (
+            not journal
+            or not journal.resume
+            or self.base_downloader.overwrite
+            or self.song_downloader.synced_lyrics_only
+        ):
+            return None
+
+        journal_item = journal.get_item(media_metadata["id"])
+        if (
+            not journal_item
+            or journal_item["stage"] != DownloadStage.FINAL.name
+            or not journal_item["final_path"]
+            or not Path(journal_item["final_path"]).exists()
+        ):
+            return None
+
+        return self.get_existing_download_item(
+            media_metadata,
+            playlist_metadata,
+            journal_item["final_path"],
+        )
+
+    def get_existing_download_item(
+        self,
+        media_metadata: dict,
+        playlist_metadata: dict,
+        final_path: str,
+    ) -> DownloadItem:
+        download_item = DownloadItem(
+            media_metadata=media_metadata,
+            playlist_metadata=playlist_metadata,
+            final_path=final_path,
+        )
+        if playlist_metadata:
+            download_item.playlist_tags = self.base_downloader.naming.get_playlist_tags(
+                playlist_metadata,
+                media_metadata,
+            )
+            download_item.playlist_file_path = str(
+                self.base_downloader.naming.get_playlist_file_path(
+                    download_item.playlist_tags,
+                )
+            )
+
+        return download_item
+
+    def add_library_index_key_tag(self, download_item: DownloadItem) -> None:
+        if not self.library_index:
+            return
+
+        library_index_key = self.get_library_index_key(
+            download_item.media_metadata,
+            download_item.playlist_metadata,
+        )
+        if library_index_key is None:
+            return
+
+        # Recorded in the file so rebuild_library_index can restore the exact key
+        # it was downloaded under instead of assuming the current settings
+        download_item.extra_tags = {
+            **(download_item.extra_tags or {}),
+            LIBRARY_INDEX_KEY_TAG: [json.dumps(library_index_key).encode()],
+        }
+
+    def update_library_index(
+        self,
+        download_item: DownloadItem,
+        path: str,
+    ) -> None:
+        if not self.library_index:
+            return
+
+        library_index_key = self.get_library_index_key(
+            download_item.media_metadata,
+            download_item.playlist_metadata,
+        )
+        if library_index_key is None:
+            return
+
+        media_id, variant, template_hash, playlist_id = library_index_key
+        self.library_index.set(
+            media_id,
+            variant,
+            template_hash,
+            str(Path(path).resolve()),
+            playlist_id,
+        )
+
+    def rebuild_library_index(self) -> int:
+        start_time = time.perf_counter()
+        self.library_index.clear()
+
+        indexed_count = 0
+        skipped_mp3_count = 0
+        for media_path in Path(self.base_downloader.output_path).rglob("*"):
+            if media_path.suffix == ".mp3":
+                skipped_mp3_count += 1
+                continue
+
+            if media_path.suffix not in {".m4a", ".m4v", ".mp4"}:
+                continue
+
+            try:
+                media_tags = MP4(media_path).tags or {}
+            except Exception:
+                logger.debug(f"Could not read tags from {media_path}")
+                continue
+
+            library_index_key = next(iter(media_tags.get(LIBRARY_INDEX_KEY_TAG, [])), None)
+            if library_index_key is None:
+                logger.debug(f"No library index key in {media_path}")
+                continue
+
+            media_id, variant, template_hash, playlist_id = json.loads(
+                bytes(library_index_key)
+            )
+            self.library_index.set(
+                media_id,
+                variant,
+                template_hash,
+                str(media_path.resolve()),
+                playlist_id,
+                commit=False,
+            )
+            indexed_count += 1
+
+        self.library_index.commit()
+        if skipped_mp3_count:
+            logger.warning(
+                f"Skipped {skipped_mp3_count} MP3 file(s), "
+                "MP3 files can't be added to the library index by a rebuild"
+            )
+        logger.debug(
+            f"Indexed {indexed_count} media files in "
+            f"{time.perf_counter() - start_time:.2f}s"
+        )
+
+        return indexed_count
+
+    def get_existing_path(
+        self,
+        download_item: DownloadItem,
+    ) -> str | None:
+        if self.base_downloader.overwrite or not download_item.final_path:
+            return None
+
+        if Path(download_item.final_path).exists():
+            return download_item.final_path
+
+        if download_item.media_metadata["type"] in SONG_MEDIA_TYPE:
+            for ext in self.AUDIO_EXTENSIONS:
+                if Path(download_item.final_path).with_suffix(ext).exists():
+                    return str(Path(download_item.final_path).with_suffix(ext))
+
+        return None
+
     async def _initial_processing(
         self,
         download_item: DownloadItem,
@@ -547,3 +975,7 @@ class AppleMusicDownloader:
                 download_item.staged_path,
                 download_item.final_path,
             )
+
+        if download_item.final_path and Path(download_item.final_path).exists():
+            self.update_library_index(download_item, download_item.final_path)
+            self.base_downloader.update_stage(download_item, DownloadStage.FINAL)
@@ -1,20 +1,28 @@
+import json
+import logging
 import uuid
 import shutil
 from pathlib import Path
-from typing import Union, List
+from typing import BinaryIO, Union, List
 from pywidevine import Cdm, Device
 
+from ..interface.cdm_session_pool import CdmSessionPool
+from ..interface.constants import CDM_SESSION_POOL_SIZE
 from ..interface.enums import CoverFormat
 from ..metadata.tagger_mp3 import MP3Tagger
 from ..metadata.tagger_mp4 import MP4Tagger
 from ..interface.types import MediaTags
+from .types import DownloadItem
 from ..naming.provider import NamingProvider
 from ..processors.stream_downloader import StreamDownloader
 from ..processors.decryptor import Decryptor
 from ..processors.remuxer import Remuxer
-from .enums import DownloadMode, RemuxMode
+from .batch_journal import BatchJournal
+from .enums import DecryptMode, DownloadMode, DownloadStage, RemuxMode
 from .hardcoded_wvd import HARDCODED_WVD
 
+logger = logging.getLogger(__name__)
+
 
 class AppleMusicBaseDownloader:
     def __init__(
@@ -22,6 +30,7 @@ class AppleMusicBaseDownloader:
         output_path: str = "./AppleMusic",
         temp_path: str = ".",
         wvd_path: str = None,
+        cdm_session_pool_size: int = CDM_SESSION_POOL_SIZE,
         overwrite: bool = False,
         save_cover: bool = False,
         save_playlist: bool = False,
@@ -33,7 +42,11 @@ class AppleMusicBaseDownloader:
         use_wrapper: bool = False,
         wrapper_decrypt_ip: str = "127.0.0.1:10020",
         download_mode: DownloadMode = DownloadMode.YTDLP,
+        segment_concurrency: int = 8,
+        segment_retries: int = 3,
+        decrypt_mode: DecryptMode = DecryptMode.MP4DECRYPT,
         remux_mode: RemuxMode = RemuxMode.FFMPEG,
+        in_memory_staging: bool = False,
         cover_format: CoverFormat = CoverFormat.JPG,
         album_folder_template: str = "{album_artist}/{album}",
         compilation_folder_template: str = "Compilations/{album}",
@@ -49,10 +62,13 @@ class AppleMusicBaseDownloader:
         silent: bool = False,
         remux_to_mp3: bool = False,
         mp3_bitrate: str = "mid",
+        journal_path: str = None,
+        resume: bool = False,
     ):
         self.output_path = output_path
         self.temp_path = temp_path
         self.wvd_path = wvd_path
+        self.cdm_session_pool_size = cdm_session_pool_size
         self.overwrite = overwrite
         self.save_cover = save_cover
         self.save_playlist = save_playlist
@@ -64,7 +80,11 @@ class AppleMusicBaseDownloader:
         self.use_wrapper = use_wrapper
         self.wrapper_decrypt_ip = wrapper_decrypt_ip
         self.download_mode = download_mode
+        self.segment_concurrency = segment_concurrency
+        self.segment_retries = segment_retries
+        self.decrypt_mode = decrypt_mode
         self.remux_mode = remux_mode
+        self.in_memory_staging = in_memory_staging
         self.cover_format = cover_format
         self.album_folder_template = album_folder_template
         self.compilation_folder_template = compilation_folder_template
@@ -80,6 +100,8 @@ class AppleMusicBaseDownloader:
         self.silent = silent
         self.remux_to_mp3 = remux_to_mp3
         self.mp3_bitrate = mp3_bitrate
+        self.journal_path = journal_path
+        self.resume = resume
         
         self.initialize()
 
@@ -100,7 +122,10 @@ class AppleMusicBaseDownloader:
             self.cdm = Cdm.from_device(Device.load(self.wvd_path))
         else:
             self.cdm = Cdm.from_device(Device.loads(HARDCODED_WVD))
-        self.cdm.MAX_NUM_OF_SESSIONS = float("inf")
+        self.cdm_session_pool = CdmSessionPool(
+            self.cdm,
+            self.cdm_session_pool_size,
+        )
 
     def _initialize_services(self):
         self.naming = NamingProvider(
@@ -120,17 +145,75 @@ class AppleMusicBaseDownloader:
             ffmpeg_path=self.full_ffmpeg_path,
             nm3u8dlre_path=self.full_nm3u8dlre_path,
             silent=self.silent,
+            segment_concurrency=self.segment_concurrency,
+            segment_retries=self.segment_retries,
         )
         self.decryptor = Decryptor(
             mp4decrypt_path=self.full_mp4decrypt_path,
             amdecrypt_path=self.full_amdecrypt_path,
             silent=self.silent,
+            decrypt_mode=self.decrypt_mode,
         )
         self.remuxer = Remuxer(
             ffmpeg_path=self.full_ffmpeg_path,
             mp4box_path=self.full_mp4box_path,
             silent=self.silent,
         )
+        self.journal = (
+            BatchJournal(self.journal_path, self.resume) if self.journal_path else None
+        )
+
+    def update_stage(self, download_item: DownloadItem, stage: DownloadStage) -> None:
+        download_item.stage = stage
+        self.write_checkpoint(download_item)
+        if self.journal:
+            self.journal.update_stage(download_item, stage)
+
+    def get_checkpoint_path(self, download_item: DownloadItem) -> Path:
+        return self.naming.get_temp_path(
+            download_item.media_metadata["id"],
+            download_item.random_uuid,
+            "checkpoint",
+            ".json",
+        )
+
+    def write_checkpoint(self, download_item: DownloadItem) -> None:
+        if not download_item.random_uuid:
+            return
+
+        checkpoint_path = self.get_checkpoint_path(download_item)
+        if not checkpoint_path.parent.exists():
+            return
+
+        partial_checkpoint_path = checkpoint_path.with_suffix(".part")
+        partial_checkpoint_path.write_text(
+            json.dumps({"stage": download_item.stage.name}),
+            encoding="utf-8",
+        )
+        partial_checkpoint_path.replace(checkpoint_path)
+
+    def restore_checkpoint(self, download_item: DownloadItem) -> None:
+        if not download_item.random_uuid or self.has_reached_stage(
+            download_item,
+            DownloadStage.FINAL,
+        ):
+            return
+
+        checkpoint_path = self.get_checkpoint_path(download_item)
+        if not checkpoint_path.exists():
+            return
+
+        download_item.stage = DownloadStage[
+            json.loads(checkpoint_path.read_text(encoding="utf-8"))["stage"]
+        ]
+        logger.debug(
+            f"Resuming {download_item.media_metadata['id']} "
+            f"after stage {download_item.stage.name}"
+        )
+
+    @staticmethod
+    def has_reached_stage(download_item: DownloadItem, stage: DownloadStage) -> bool:
+        return download_item.stage is not None and download_item.stage.value >= stage.value
 
     async def apply_tags(
         self,
@@ -138,18 +221,19 @@ class AppleMusicBaseDownloader:
         tags: MediaTags,
         cover_bytes: bytes | None,
         extra_tags: dict | None = None,
+        media_file: BinaryIO | None = None,
     ):
         skip_tagging = "all" in self.exclude_tags
         if media_path.suffix == ".mp3":
             MP3Tagger.apply(
-                media_path,
+                media_file or media_path,
                 tags.as_mp4_tags(self.date_tag_template),
                 cover_bytes,
                 skip_tagging,
             )
         else:
             MP4Tagger.apply(
-                media_path,
+                media_file or media_path,
                 tags.as_mp4_tags(self.date_tag_template),
                 cover_bytes,
                 skip_tagging,
@@ -169,6 +253,11 @@ class AppleMusicBaseDownloader:
         final_path.parent.mkdir(parents=True, exist_ok=True)
         shutil.move(str(stage_path), str(final_path))
 
+    def write_to_final_path(self, media_bytes: bytes, final_path: Union[str, Path]) -> None:
+        final_path = Path(final_path)
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        final_path.write_bytes(media_bytes)
+
     def cleanup_temp(self, folder_tag: str):
         shutil.rmtree(Path(self.temp_path) / f"gamdl_temp_{folder_tag}", ignore_errors=True)
 
@@ -183,6 +272,10 @@ class AppleMusicBaseDownloader:
         # Simple M3U8 update logic
         if not playlist_file_path.exists():
             playlist_file_path.write_text("#EXTM3U\n", encoding="utf8")
-            
+        elif str(final_path) in playlist_file_path.read_text(
+            encoding="utf8"
+        ).splitlines():
+            return
+
         with open(playlist_file_path, "a", encoding="utf8") as f:
             f.write(f"{final_path}\n")
@@ -1,12 +1,23 @@
+import logging
+import time
 from pathlib import Path
 
 from ..interface.enums import MusicVideoCodec, MusicVideoResolution
 from ..interface.interface_music_video import AppleMusicMusicVideoInterface
 from ..interface.types import DecryptionKeyAv
+from ..utils import gather_or_cancel
 from .downloader_base import AppleMusicBaseDownloader
-from .enums import RemuxFormatMusicVideo, RemuxMode
+from .enums import (
+    DecryptMode,
+    DownloadMode,
+    DownloadStage,
+    RemuxFormatMusicVideo,
+    RemuxMode,
+)
 from .types import DownloadItem
 
+logger = logging.getLogger(__name__)
+
 
 class AppleMusicMusicVideoDownloader(AppleMusicBaseDownloader):
     def __init__(
@@ -26,40 +37,70 @@ class AppleMusicMusicVideoDownloader(AppleMusicBaseDownloader):
         self.remux_format = remux_format
         self.resolution = resolution
 
-    async def stage(
+    def can_decrypt_streaming(self) -> bool:
+        return (
+            self.download_mode == DownloadMode.NATIVE
+            and self.decrypt_mode == DecryptMode.NATIVE
+        )
+
+    async def download_decrypt_streaming(
+        self,
+        stream_url: str,
+        decrypted_path: str,
+        decryption_key: str,
+    ):
+        start_time = time.perf_counter()
+
+        await self.decryptor.decrypt_native_stream(
+            self.streamer.stream_native(stream_url),
+            decrypted_path,
+            decryption_key,
+        )
+
+        logger.debug(
+            f'Downloaded and decrypted "{Path(decrypted_path).name}" '
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
+
+    async def remux(
+        self,
+        decrypted_path_video: str,
+        decrypted_path_audio: str,
+        staged_path: str,
+    ):
+        if self.remux_mode == RemuxMode.MP4BOX:
+            await self.remuxer.remux_mp4box(
+                [decrypted_path_audio, decrypted_path_video],
+                staged_path,
+            )
+        else:
+            await self.remuxer.remux_ffmpeg(
+                [decrypted_path_video, decrypted_path_audio],
+                staged_path,
+                copy_subtitles=True,
+            )
+
+    async def decrypt(
         self,
         encrypted_path_video: str,
         encrypted_path_audio: str,
         decrypted_path_video: str,
         decrypted_path_audio: str,
-        staged_path: str,
         decryption_key: DecryptionKeyAv,
     ):
-        await self.decryptor.decrypt_mp4decrypt(
+        await self.decryptor.decrypt(
             encrypted_path_video,
             decrypted_path_video,
             decryption_key.video_track.key,
             legacy=True,
         )
-        await self.decryptor.decrypt_mp4decrypt(
+        await self.decryptor.decrypt(
             encrypted_path_audio,
             decrypted_path_audio,
             decryption_key.audio_track.key,
             legacy=True,
         )
 
-        if self.remux_mode == RemuxMode.MP4BOX:
-            await self.remuxer.remux_mp4box(
-                [decrypted_path_audio, decrypted_path_video],
-                staged_path,
-            )
-        else:
-            await self.remuxer.remux_ffmpeg(
-                [decrypted_path_video, decrypted_path_audio],
-                staged_path,
-                copy_subtitles=True,
-            )
-
     async def get_download_item(
         self,
         music_video_metadata: dict,
@@ -70,10 +111,6 @@ class AppleMusicMusicVideoDownloader(AppleMusicBaseDownloader):
         download_item.media_metadata = music_video_metadata
         download_item.playlist_metadata = playlist_metadata
 
-        music_video_id = self.interface.get_media_id_of_library_media(
-            music_video_metadata,
-        )
-
         itunes_page_metadata = await self.interface.get_itunes_page_metadata(
             music_video_metadata,
         )
@@ -98,29 +135,9 @@ class AppleMusicMusicVideoDownloader(AppleMusicBaseDownloader):
             self.resolution,
         )
 
-        download_item.decryption_key = await self.interface.get_decryption_key(
-            download_item.stream_info,
-            self.cdm,
-        )
-
-        download_item.random_uuid = self.get_random_uuid()
-        staged_extension = (
-            "."
-            + (
-                "mp4"
-                if self.remux_format == RemuxFormatMusicVideo.MP4
-                else download_item.stream_info.file_format.value
-            )
-        )
-        download_item.staged_path = str(self.naming.get_temp_path(
-            music_video_id,
-            download_item.random_uuid,
-            "staged",
-            staged_extension,
-        ))
         download_item.final_path = str(self.naming.get_final_path(
             download_item.media_tags,
-            Path(download_item.staged_path).suffix,
+            self.get_staged_extension(download_item),
             download_item.playlist_tags,
         ))
 
@@ -144,57 +161,117 @@ class AppleMusicMusicVideoDownloader(AppleMusicBaseDownloader):
 
         return download_item
 
+    def get_staged_extension(self, download_item: DownloadItem) -> str:
+        return "." + (
+            "mp4"
+            if self.remux_format == RemuxFormatMusicVideo.MP4
+            else download_item.stream_info.file_format.value
+        )
+
+    async def resolve_media(self, download_item: DownloadItem) -> None:
+        download_item.decryption_key = await self.interface.get_decryption_key(
+            download_item.stream_info,
+            self.cdm_session_pool,
+        )
+
+        download_item.random_uuid = self.get_random_uuid()
+        download_item.staged_path = str(self.naming.get_temp_path(
+            self.interface.get_media_id_of_library_media(
+                download_item.media_metadata,
+            ),
+            download_item.random_uuid,
+            "staged",
+            self.get_staged_extension(download_item),
+        ))
+
     async def download(
         self,
         download_item: DownloadItem,
     ) -> None:
-        encrypted_path_video = str(self.naming.get_temp_path(
+        decrypted_path_video = str(self.naming.get_temp_path(
             download_item.media_metadata["id"],
             download_item.random_uuid,
-            "encrypted_video",
+            "decrypted_video",
             ".mp4",
         ))
-        encrypted_path_audio = str(self.naming.get_temp_path(
+        decrypted_path_audio = str(self.naming.get_temp_path(
             download_item.media_metadata["id"],
             download_item.random_uuid,
-            "encrypted_audio",
+            "decrypted_audio",
             ".m4a",
         ))
 
-        await self.streamer.download(
-            download_item.stream_info.video_track.stream_url,
-            Path(encrypted_path_video),
-        )
-        await self.streamer.download(
-            download_item.stream_info.audio_track.stream_url,
-            Path(encrypted_path_audio),
-        )
-
-        decrypted_path_video = str(self.naming.get_temp_path(
+        encrypted_path_video = str(self.naming.get_temp_path(
             download_item.media_metadata["id"],
             download_item.random_uuid,
-            "decrypted_video",
+            "encrypted_video",
             ".mp4",
         ))
-        decrypted_path_audio = str(self.naming.get_temp_path(
+        encrypted_path_audio = str(self.naming.get_temp_path(
             download_item.media_metadata["id"],
             download_item.random_uuid,
-            "decrypted_audio",
+            "encrypted_audio",
             ".m4a",
         ))
 
-        await self.stage(
-            encrypted_path_video,
-            encrypted_path_audio,
-            decrypted_path_video,
-            decrypted_path_audio,
-            download_item.staged_path,
-            download_item.decryption_key,
-        )
+        if not self.has_reached_stage(download_item, DownloadStage.DOWNLOADED):
+            start_time = time.perf_counter()
 
-        cover_bytes = await self.interface.get_cover_bytes(download_item.cover_url)
-        await self.apply_tags(
-            Path(download_item.staged_path),
-            download_item.media_tags,
-            cover_bytes,
-        )
+            if self.can_decrypt_streaming():
+                await gather_or_cancel(
+                    self.download_decrypt_streaming(
+                        download_item.stream_info.video_track.stream_url,
+                        decrypted_path_video,
+                        download_item.decryption_key.video_track.key,
+                    ),
+                    self.download_decrypt_streaming(
+                        download_item.stream_info.audio_track.stream_url,
+                        decrypted_path_audio,
+                        download_item.decryption_key.audio_track.key,
+                    ),
+                )
+            else:
+                await gather_or_cancel(
+                    self.streamer.download(
+                        download_item.stream_info.video_track.stream_url,
+                        Path(encrypted_path_video),
+                    ),
+                    self.streamer.download(
+                        download_item.stream_info.audio_track.stream_url,
+                        Path(encrypted_path_audio),
+                    ),
+                )
+            logger.debug(
+                f"Downloaded music video tracks in {time.perf_counter() - start_time:.2f}s"
+            )
+            self.update_stage(download_item, DownloadStage.DOWNLOADED)
+            if self.can_decrypt_streaming():
+                self.update_stage(download_item, DownloadStage.DECRYPTED)
+
+        if not self.has_reached_stage(download_item, DownloadStage.DECRYPTED):
+            await self.decrypt(
+                encrypted_path_video,
+                encrypted_path_audio,
+                decrypted_path_video,
+                decrypted_path_audio,
+                download_item.decryption_key,
+            )
+            self.update_stage(download_item, DownloadStage.DECRYPTED)
+
+        if not self.has_reached_stage(download_item, DownloadStage.STAGED):
+            await self.remux(
+                decrypted_path_video,
+                decrypted_path_audio,
+                download_item.staged_path,
+            )
+            self.update_stage(download_item, DownloadStage.STAGED)
+
+        if not self.has_reached_stage(download_item, DownloadStage.TAGGED):
+            cover_bytes = await self.interface.get_cover_bytes(download_item.cover_url)
+            await self.apply_tags(
+                Path(download_item.staged_path),
+                download_item.media_tags,
+                cover_bytes,
+                download_item.extra_tags,
+            )
+            self.update_stage(download_item, DownloadStage.TAGGED)
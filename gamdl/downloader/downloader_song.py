@@ -1,12 +1,21 @@
+import asyncio
+import io
+import logging
+import time
+import typing
 from pathlib import Path
 
 from ..interface.enums import SongCodec, SyncedLyricsFormat
 from ..interface.interface_song import AppleMusicSongInterface
 from ..interface.types import DecryptionKeyAv
+from ..utils import gather_or_cancel
+from .constants import MP3_BITRATE_MAP
 from .downloader_base import AppleMusicBaseDownloader
-from .enums import RemuxMode
+from .enums import DownloadStage, RemuxMode
 from .types import DownloadItem
 
+logger = logging.getLogger(__name__)
+
 
 class AppleMusicSongDownloader(AppleMusicBaseDownloader):
     def __init__(
@@ -19,6 +28,7 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
         synced_lyrics_only: bool = False,
         use_album_date: bool = False,
         fetch_extra_tags: bool = False,
+        catalog_tags: bool = False,
     ):
         self.__dict__.update(base_downloader.__dict__)
         self.interface = interface
@@ -28,6 +38,7 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
         self.synced_lyrics_only = synced_lyrics_only
         self.use_album_date = use_album_date
         self.fetch_extra_tags = fetch_extra_tags
+        self.catalog_tags = catalog_tags
 
     async def get_download_item(
         self,
@@ -41,21 +52,36 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
 
         song_id = self.interface.get_media_id_of_library_media(song_metadata)
 
-        download_item.lyrics = await self.interface.get_lyrics(
-            song_metadata,
-            self.synced_lyrics_format,
-        )
+        start_time = time.perf_counter()
+        webplayback_task = None
 
-        webplayback = await self.interface.apple_music_api.get_webplayback(song_id)
-        download_item.media_tags = await self.interface.get_tags(
-            webplayback,
-            download_item.lyrics.unsynced if download_item.lyrics else None,
-            self.use_album_date,
-        )
+        def get_webplayback() -> asyncio.Future:
+            nonlocal webplayback_task
+            if webplayback_task is None:
+                webplayback_task = asyncio.ensure_future(
+                    self.interface.apple_music_api.get_webplayback(song_id)
+                )
+            return webplayback_task
+
+        if not self.use_catalog_tags():
+            get_webplayback()
+
+        resolvers = [self.resolve_tags(download_item, get_webplayback)]
         if self.fetch_extra_tags:
-            download_item.extra_tags = await self.interface.get_extra_tags(
-                song_metadata,
-            )
+            resolvers.append(self.resolve_extra_tags(download_item))
+        if not self.synced_lyrics_only:
+            resolvers.append(self.resolve_cover(download_item))
+        try:
+            await gather_or_cancel(*resolvers)
+            if self.codec.is_legacy() and not self.synced_lyrics_only:
+                download_item.webplayback = await get_webplayback()
+        finally:
+            if webplayback_task is not None:
+                webplayback_task.cancel()
+        logger.debug(
+            f"Resolved song metadata {song_id} in "
+            f"{time.perf_counter() - start_time:.2f}s"
+        )
 
         if playlist_metadata:
             download_item.playlist_tags = self.naming.get_playlist_tags(
@@ -79,20 +105,104 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
         if self.synced_lyrics_only:
             return download_item
 
+        if download_item.cover_file_extension:
+            download_item.cover_path = str(self.naming.get_cover_path(
+                Path(download_item.final_path),
+                download_item.cover_file_extension,
+            ))
+
+        return download_item
+
+    async def resolve_media(self, download_item: DownloadItem) -> None:
+        if self.synced_lyrics_only:
+            return
+
+        song_id = self.interface.get_media_id_of_library_media(
+            download_item.media_metadata,
+        )
+
+        async def get_webplayback() -> dict:
+            if download_item.webplayback is None:
+                download_item.webplayback = (
+                    await self.interface.apple_music_api.get_webplayback(song_id)
+                )
+            return download_item.webplayback
+
+        try:
+            await self.resolve_stream(download_item, song_id, get_webplayback)
+        finally:
+            download_item.webplayback = None
+
+        download_item.random_uuid = self.get_random_uuid()
+        if download_item.stream_info and download_item.stream_info.file_format:
+            staged_extension = (
+                ".mp3"
+                if self.remux_to_mp3
+                else "." + download_item.stream_info.file_format.value
+            )
+            download_item.staged_path = str(self.naming.get_temp_path(
+                song_id,
+                download_item.random_uuid,
+                "staged",
+                staged_extension,
+            ))
+        else:
+            download_item.staged_path = None
+
+    def use_catalog_tags(self) -> bool:
+        return self.catalog_tags and not self.codec.is_legacy()
+
+    async def resolve_tags(
+        self,
+        download_item: DownloadItem,
+        get_webplayback: typing.Callable[[], typing.Awaitable[dict]],
+    ) -> None:
+        download_item.lyrics = await self.interface.get_lyrics(
+            download_item.media_metadata,
+            self.synced_lyrics_format,
+        )
+        unsynced_lyrics = (
+            download_item.lyrics.unsynced if download_item.lyrics else None
+        )
+
+        if self.use_catalog_tags():
+            download_item.media_tags = await self.interface.get_tags_catalog(
+                download_item.media_metadata,
+                unsynced_lyrics,
+                self.use_album_date,
+            )
+        if not download_item.media_tags:
+            download_item.media_tags = await self.interface.get_tags(
+                await get_webplayback(),
+                unsynced_lyrics,
+                self.use_album_date,
+            )
+
+    async def resolve_extra_tags(self, download_item: DownloadItem) -> None:
+        download_item.extra_tags = await self.interface.get_extra_tags(
+            download_item.media_metadata,
+        )
+
+    async def resolve_stream(
+        self,
+        download_item: DownloadItem,
+        song_id: str,
+        get_webplayback: typing.Callable[[], typing.Awaitable[dict]],
+    ) -> None:
         if self.codec.is_legacy():
             download_item.stream_info = await self.interface.get_stream_info_legacy(
-                webplayback,
+                await get_webplayback(),
                 self.codec,
             )
             download_item.decryption_key = (
                 await self.interface.get_decryption_key_legacy(
                     download_item.stream_info,
-                    self.cdm,
+                    self.cdm_session_pool,
                 )
             )
         else:
             download_item.stream_info = await self.interface.get_stream_info(
-                song_metadata,
+                download_item.media_metadata,
                 self.codec,
             )
             if (
@@ -102,12 +212,13 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
                 download_item.decryption_key = (
                     await self.interface.get_decryption_key(
                         download_item.stream_info,
-                        self.cdm,
+                        self.cdm_session_pool,
                     )
                 )
 
+    async def resolve_cover(self, download_item: DownloadItem) -> None:
         download_item.cover_url_template = self.interface.get_cover_url_template(
-            song_metadata,
+            download_item.media_metadata,
             self.cover_format,
         )
         download_item.cover_url = self.interface.get_cover_url(
@@ -115,36 +226,14 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
             self.cover_size,
             self.cover_format,
         )
-
-        download_item.random_uuid = self.get_random_uuid()
-        if download_item.stream_info and download_item.stream_info.file_format:
-            staged_extension = (
-                ".mp3"
-                if self.remux_to_mp3
-                else "." + download_item.stream_info.file_format.value
+        download_item.cover_file_extension = (
+            await self.interface.get_cover_file_extension(
+                download_item.cover_url,
+                self.cover_format,
             )
-            download_item.staged_path = str(self.naming.get_temp_path(
-                song_id,
-                download_item.random_uuid,
-                "staged",
-                staged_extension,
-            ))
-        else:
-            download_item.staged_path = None
-
-        cover_file_extension = await self.interface.get_cover_file_extension(
-            download_item.cover_url,
-            self.cover_format,
         )
-        if cover_file_extension:
-            download_item.cover_path = str(self.naming.get_cover_path(
-                Path(download_item.final_path),
-                cover_file_extension,
-            ))
-
-        return download_item
 
-    async def stage(
+    async def decrypt(
         self,
         encrypted_path: str,
         decrypted_path: str,
@@ -153,6 +242,34 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
         codec: SongCodec,
         media_id: str,
         fairplay_key: str,
+    ) -> bool:
+        if codec.is_legacy() and self.remux_mode == RemuxMode.FFMPEG:
+            return False
+
+        if codec.is_legacy() or not self.use_wrapper:
+            await self.decryptor.decrypt(
+                encrypted_path,
+                decrypted_path,
+                decryption_key.audio_track.key,
+                codec.is_legacy(),
+            )
+            return False
+
+        await self.decryptor.decrypt_amdecrypt(
+            encrypted_path,
+            decrypted_path if self.remux_to_mp3 else staged_path,
+            media_id,
+            fairplay_key,
+        )
+        return not self.remux_to_mp3
+
+    async def remux(
+        self,
+        encrypted_path: str,
+        decrypted_path: str,
+        staged_path: str,
+        decryption_key: DecryptionKeyAv,
+        codec: SongCodec,
     ):
         if self.remux_to_mp3:
             if codec.is_legacy() and self.remux_mode == RemuxMode.FFMPEG:
@@ -161,25 +278,10 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
                     decrypted_path,
                     decryption_key.audio_track.key,
                 )
-            elif codec.is_legacy() or not self.use_wrapper:
-                await self.decryptor.decrypt_mp4decrypt(
-                    encrypted_path,
-                    decrypted_path,
-                    decryption_key.audio_track.key,
-                    codec.is_legacy(),
-                )
-            else:
-                await self.decryptor.decrypt_amdecrypt(
-                    encrypted_path,
-                    decrypted_path,
-                    media_id,
-                    fairplay_key,
-                )
-            bitrate_map = {"low": "128k", "mid": "160k", "high": "192k", "best": "320k"}
             await self.remuxer.remux_mp3(
                 decrypted_path, 
                 staged_path, 
-                bitrate_map.get(self.mp3_bitrate, "160k")
+                MP3_BITRATE_MAP.get(self.mp3_bitrate, "160k")
             )
             return
 
@@ -189,31 +291,58 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
                 staged_path,
                 decryption_key.audio_track.key,
             )
-        elif codec.is_legacy() or not self.use_wrapper:
-            await self.decryptor.decrypt_mp4decrypt(
-                encrypted_path,
-                decrypted_path,
-                decryption_key.audio_track.key,
-                codec.is_legacy(),
+        elif self.remux_mode == RemuxMode.FFMPEG:
+            await self.remuxer.remux_ffmpeg(
+                [decrypted_path],
+                staged_path,
             )
-            if self.remux_mode == RemuxMode.FFMPEG:
-                await self.remuxer.remux_ffmpeg(
-                    [decrypted_path],
-                    staged_path,
-                )
-            else:
-                await self.remuxer.remux_mp4box(
-                    [decrypted_path],
-                    staged_path,
-                )
         else:
-            await self.decryptor.decrypt_amdecrypt(
-                encrypted_path,
+            await self.remuxer.remux_mp4box(
+                [decrypted_path],
                 staged_path,
-                media_id,
-                fairplay_key,
             )
 
+    def can_stage_in_memory(self) -> bool:
+        return (
+            self.in_memory_staging
+            and self.remux_mode == RemuxMode.FFMPEG
+            and (self.codec.is_legacy() or not self.use_wrapper)
+        )
+
+    async def stage_in_memory(
+        self,
+        stream_url: str,
+        decryption_key: DecryptionKeyAv,
+        codec: SongCodec,
+    ) -> bytes:
+        start_time = time.perf_counter()
+
+        media_bytes = bytearray()
+        async for segment in self.streamer.stream_native(stream_url):
+            media_bytes += segment
+
+        await self.decryptor.decrypt_native_buffer(
+            media_bytes,
+            decryption_key.audio_track.key,
+            codec.is_legacy(),
+        )
+
+        staged_bytes = await self.remuxer.remux_ffmpeg_buffer(
+            media_bytes,
+            (
+                MP3_BITRATE_MAP.get(self.mp3_bitrate, "160k")
+                if self.remux_to_mp3
+                else None
+            ),
+        )
+
+        logger.debug(
+            f"Staged {len(staged_bytes)} bytes in memory "
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
+
+        return staged_bytes
+
     def write_synced_lyrics(
         self,
         synced_lyrics: str,
@@ -229,31 +358,78 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
         if self.synced_lyrics_only:
             return
 
+        if self.can_stage_in_memory() and not self.has_reached_stage(
+            download_item,
+            DownloadStage.DOWNLOADED,
+        ):
+            await self.download_in_memory(download_item)
+            return
+
         encrypted_path = str(self.naming.get_temp_path(
             download_item.media_metadata["id"],
             download_item.random_uuid,
             "encrypted",
             ".m4a",
         ))
-        await self.streamer.download(
-            download_item.stream_info.audio_track.stream_url,
-            Path(encrypted_path),
-        )
-
         decrypted_path = str(self.naming.get_temp_path(
             download_item.media_metadata["id"],
             download_item.random_uuid,
             "decrypted",
             ".m4a",
         ))
-        await self.stage(
-            encrypted_path,
-            decrypted_path,
-            download_item.staged_path,
-            download_item.decryption_key,
-            self.codec,
-            download_item.media_metadata["id"],
-            download_item.stream_info.audio_track.fairplay_key,
+
+        if not self.has_reached_stage(download_item, DownloadStage.DOWNLOADED):
+            await self.streamer.download(
+                download_item.stream_info.audio_track.stream_url,
+                Path(encrypted_path),
+            )
+            self.update_stage(download_item, DownloadStage.DOWNLOADED)
+
+        if not self.has_reached_stage(download_item, DownloadStage.DECRYPTED):
+            staged = await self.decrypt(
+                encrypted_path,
+                decrypted_path,
+                download_item.staged_path,
+                download_item.decryption_key,
+                self.codec,
+                download_item.media_metadata["id"],
+                download_item.stream_info.audio_track.fairplay_key,
+            )
+            self.update_stage(
+                download_item,
+                DownloadStage.STAGED if staged else DownloadStage.DECRYPTED,
+            )
+
+        if not self.has_reached_stage(download_item, DownloadStage.STAGED):
+            await self.remux(
+                encrypted_path,
+                decrypted_path,
+                download_item.staged_path,
+                download_item.decryption_key,
+                self.codec,
+            )
+            self.update_stage(download_item, DownloadStage.STAGED)
+
+        if not self.has_reached_stage(download_item, DownloadStage.TAGGED):
+            cover_bytes = await self.interface.get_cover_bytes(download_item.cover_url)
+            await self.apply_tags(
+                Path(download_item.staged_path),
+                download_item.media_tags,
+                cover_bytes,
+                download_item.extra_tags,
+            )
+            self.update_stage(download_item, DownloadStage.TAGGED)
+
+    async def download_in_memory(
+        self,
+        download_item: DownloadItem,
+    ) -> None:
+        media_file = io.BytesIO(
+            await self.stage_in_memory(
+                download_item.stream_info.audio_track.stream_url,
+                download_item.decryption_key,
+                self.codec,
+            )
         )
 
         cover_bytes = await self.interface.get_cover_bytes(download_item.cover_url)
@@ -262,4 +438,6 @@ class AppleMusicSongDownloader(AppleMusicBaseDownloader):
             download_item.media_tags,
             cover_bytes,
             download_item.extra_tags,
+            media_file,
         )
+        self.write_to_final_path(media_file.getvalue(), download_item.final_path)
@@ -3,6 +3,7 @@ from pathlib import Path
 from ..interface.enums import UploadedVideoQuality
 from ..interface.interface_uploaded_video import AppleMusicUploadedVideoInterface
 from .downloader_base import AppleMusicBaseDownloader
+from .enums import DownloadStage
 from .types import DownloadItem
 
 
@@ -83,14 +84,19 @@ class AppleMusicUploadedVideoDownloader(AppleMusicBaseDownloader):
         self,
         download_item: DownloadItem,
     ) -> None:
-        await self.streamer.download(
-            download_item.stream_info.video_track.stream_url,
-            Path(download_item.staged_path),
-        )
+        if not self.has_reached_stage(download_item, DownloadStage.STAGED):
+            await self.streamer.download(
+                download_item.stream_info.video_track.stream_url,
+                Path(download_item.staged_path),
+            )
+            self.update_stage(download_item, DownloadStage.STAGED)
 
-        cover_bytes = await self.interface.get_cover_bytes(download_item.cover_url)
-        await self.apply_tags(
-            Path(download_item.staged_path),
-            download_item.media_tags,
-            cover_bytes,
-        )
+        if not self.has_reached_stage(download_item, DownloadStage.TAGGED):
+            cover_bytes = await self.interface.get_cover_bytes(download_item.cover_url)
+            await self.apply_tags(
+                Path(download_item.staged_path),
+                download_item.media_tags,
+                cover_bytes,
+                download_item.extra_tags,
+            )
+            self.update_stage(download_item, DownloadStage.TAGGED)
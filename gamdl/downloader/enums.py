@@ -4,6 +4,12 @@ from enum import Enum
 class DownloadMode(Enum):
     YTDLP = "ytdlp"
     NM3U8DLRE = "nm3u8dlre"
+    NATIVE = "native"
+
+
+class DecryptMode(Enum):
+    MP4DECRYPT = "mp4decrypt"
+    NATIVE = "native"
 
 
 class RemuxMode(Enum):
@@ -14,3 +20,12 @@ class RemuxMode(Enum):
 class RemuxFormatMusicVideo(Enum):
     M4V = "m4v"
     MP4 = "mp4"
+
+
+class DownloadStage(Enum):
+    RESOLVED = 1
+    DOWNLOADED = 2
+    DECRYPTED = 3
+    STAGED = 4
+    TAGGED = 5
+    FINAL = 6
@@ -17,6 +17,13 @@ class FormatNotAvailable(GamdlError):
         super().__init__(f"Requested format is not available for media ID: {media_id}")
 
 
+class MasterPlaylistNotSupported(GamdlError):
+    def __init__(self, stream_url: str):
+        super().__init__(
+            f"Expected a media playlist but got a master playlist: {stream_url}"
+        )
+
+
 class ExecutableNotFound(GamdlError):
     def __init__(self, executable: str):
         super().__init__(f"Executable not found: {executable}")
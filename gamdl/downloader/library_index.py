@@ -0,0 +1,94 @@
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class LibraryIndex:
+    def __init__(self, index_path: str) -> None:
+        self.index_path = index_path
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "stores": 0,
+        }
+        self.initialize()
+
+    def initialize(self) -> None:
+        Path(self.index_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.index_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            "media_id TEXT NOT NULL, "
+            "variant TEXT NOT NULL, "
+            "template_hash TEXT NOT NULL, "
+            "playlist_id TEXT NOT NULL, "
+            "path TEXT NOT NULL, "
+            "updated REAL NOT NULL, "
+            "PRIMARY KEY (media_id, variant, template_hash, playlist_id))"
+        )
+        self.connection.commit()
+
+    def get(
+        self,
+        media_id: str,
+        variant: str,
+        template_hash: str,
+        playlist_id: str = "",
+    ) -> str | None:
+        key = (media_id, variant, template_hash, playlist_id)
+        row = self.connection.execute(
+            "SELECT path FROM media WHERE media_id = ? AND variant = ? "
+            "AND template_hash = ? AND playlist_id = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        path = row[0]
+        if not Path(path).exists():
+            self.stats["stale"] += 1
+            self.connection.execute(
+                "DELETE FROM media WHERE media_id = ? AND variant = ? "
+                "AND template_hash = ? AND playlist_id = ?",
+                key,
+            )
+            self.connection.commit()
+            return None
+
+        self.stats["hits"] += 1
+        return path
+
+    def set(
+        self,
+        media_id: str,
+        variant: str,
+        template_hash: str,
+        path: str,
+        playlist_id: str = "",
+        commit: bool = True,
+    ) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO media "
+            "(media_id, variant, template_hash, playlist_id, path, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (media_id, variant, template_hash, playlist_id, path, time.time()),
+        )
+        if commit:
+            self.connection.commit()
+        self.stats["stores"] += 1
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def clear(self) -> None:
+        self.connection.execute("DELETE FROM media")
+        self.connection.commit()
+
+    def close(self) -> None:
+        logger.debug(f"Library index stats: {self.stats}")
+        self.connection.close()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Any
 
+from .enums import DownloadStage
 from ..interface.types import (
     DecryptionKeyAv,
     Lyrics,
@@ -23,15 +24,25 @@ class DownloadItem:
     decryption_key: DecryptionKeyAv = None
     cover_url_template: str = None
     cover_url: str = None
+    cover_file_extension: str = None
     staged_path: str = None
     final_path: str = None
     playlist_file_path: str = None
     synced_lyrics_path: str = None
     cover_path: str = None
+    webplayback: dict = None
+    media_resolved: bool = False
+    stage: DownloadStage = None
     flat_filter_result: Any = None
     error: Exception = None
 
 
+@dataclass
+class MediaQueueItem:
+    media_metadata: dict = None
+    playlist_metadata: dict = None
+
+
 @dataclass
 class UrlInfo:
     storefront: str = None
@@ -0,0 +1,95 @@
+import asyncio
+import base64
+import logging
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from pywidevine import PSSH, Cdm
+from pywidevine.key import Key
+
+from .constants import CDM_EXECUTOR_WORKERS, CDM_SESSION_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class CdmSessionPool:
+    def __init__(
+        self,
+        cdm: Cdm,
+        size: int = CDM_SESSION_POOL_SIZE,
+        executor_workers: int = CDM_EXECUTOR_WORKERS,
+    ) -> None:
+        self.cdm = cdm
+        self.size = size
+        self.executor_workers = executor_workers
+        self.stats = {
+            "exchanges": 0,
+            "wait_time": 0.0,
+            "exchange_time": 0.0,
+        }
+        self.initialize()
+
+    def initialize(self) -> None:
+        self.cdm.MAX_NUM_OF_SESSIONS = self.size
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.executor_workers,
+            thread_name_prefix="cdm",
+        )
+        self.sessions = asyncio.Queue()
+        for _ in range(self.size):
+            self.sessions.put_nowait(self.cdm.open())
+
+    async def _run_in_executor(self, func: typing.Callable, *args) -> typing.Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            func,
+            *args,
+        )
+
+    async def get_content_key(
+        self,
+        pssh: PSSH,
+        license_exchange: typing.Callable[[str], typing.Awaitable[str | bytes]],
+    ) -> Key:
+        wait_start_time = time.perf_counter()
+        session_id = await self.sessions.get()
+        exchange_start_time = time.perf_counter()
+
+        try:
+            challenge = base64.b64encode(
+                await self._run_in_executor(
+                    self.cdm.get_license_challenge,
+                    session_id,
+                    pssh,
+                )
+            ).decode()
+            license = await license_exchange(challenge)
+            await self._run_in_executor(self.cdm.parse_license, session_id, license)
+            content_key = next(
+                i for i in self.cdm.get_keys(session_id) if i.type == "CONTENT"
+            )
+        except BaseException:
+            self.cdm.close(session_id)
+            session_id = self.cdm.open()
+            raise
+        finally:
+            self.sessions.put_nowait(session_id)
+
+        wait_time = exchange_start_time - wait_start_time
+        exchange_time = time.perf_counter() - exchange_start_time
+        self.stats["exchanges"] += 1
+        self.stats["wait_time"] += wait_time
+        self.stats["exchange_time"] += exchange_time
+        logger.debug(
+            f"License exchange took {exchange_time:.2f}s "
+            f"after waiting {wait_time:.2f}s for a CDM session"
+        )
+
+        return content_key
+
+    def close(self) -> None:
+        logger.debug(f"CDM session pool stats: {self.stats}")
+        while not self.sessions.empty():
+            self.cdm.close(self.sessions.get_nowait())
+        self.executor.shutdown(wait=False)
@@ -11,6 +11,28 @@ MEDIA_RATING_STR_MAP = {
 
 LEGACY_SONG_CODECS = {"aac-legacy", "aac-he-legacy"}
 
+LYRICS_BATCH_SIZE = 100
+
+CDM_SESSION_POOL_SIZE = 4
+CDM_EXECUTOR_WORKERS = 2
+
+KEY_STORE_TTL = 60 * 60 * 24 * 30
+KEY_STORE_SECRET_SIZE = 32
+
+CATALOG_CONTENT_RATING_MAP = {
+    "explicit": 1,
+    "clean": 2,
+}
+
+CATALOG_TAGS_REQUIRED_FIELDS = (
+    "album",
+    "album_artist",
+    "artist",
+    "disc",
+    "title",
+    "track",
+)
+
 DRM_DEFAULT_KEY_MAPPING = {
     "urn:uuid:edef8ba9-79d6-4ace-a3c8-27dcd51d21ed": (
         "data:text/plain;base64,AAAAOHBzc2gAAAAA7e+LqXnWSs6jyCfc1R0h7QAAABgSEAAAAAA"
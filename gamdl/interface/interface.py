@@ -1,19 +1,20 @@
-import asyncio
-import base64
 import datetime
+import functools
 import logging
 import re
 from io import BytesIO
 
 from async_lru import alru_cache
 from PIL import Image
-from pywidevine import PSSH, Cdm
+from pywidevine import PSSH
 
 from ..api.apple_music_api import AppleMusicApi
 from ..api.itunes_api import ItunesApi
 from ..utils import get_response
+from .cdm_session_pool import CdmSessionPool
 from .constants import IMAGE_FILE_EXTENSION_MAP
 from .enums import CoverFormat
+from .key_store import KeyStore
 from .types import DecryptionKey
 
 logger = logging.getLogger(__name__)
@@ -24,9 +25,17 @@ class AppleMusicInterface:
         self,
         apple_music_api: AppleMusicApi,
         itunes_api: ItunesApi,
+        key_store_path: str | None = None,
+        key_store_secret_path: str | None = None,
     ) -> None:
         self.apple_music_api = apple_music_api
         self.itunes_api = itunes_api
+        self.key_store_path = key_store_path
+        self.key_store_secret_path = key_store_secret_path
+
+        self.key_store = (
+            KeyStore(key_store_path, key_store_secret_path) if key_store_path else None
+        )
 
     @staticmethod
     def get_media_id_of_library_media(library_media_metadata: dict) -> str:
@@ -37,34 +46,33 @@ class AppleMusicInterface:
     def parse_date(date: str) -> datetime.datetime:
         return datetime.datetime.fromisoformat(date.split("Z")[0])
 
+    async def get_license(
+        self,
+        track_id: str,
+        track_uri: str,
+        challenge: str,
+    ) -> str:
+        license_response = await self.apple_music_api.get_license_exchange(
+            track_id,
+            track_uri,
+            challenge,
+        )
+        return license_response["license"]
+
     async def get_decryption_key(
         self,
         track_uri: str,
         track_id: str,
-        cdm: Cdm,
+        cdm_session_pool: CdmSessionPool,
     ) -> DecryptionKey:
-        try:
-            cdm_session = cdm.open()
-
-            pssh_obj = PSSH(track_uri.split(",")[-1])
-
-            challenge = base64.b64encode(
-                await asyncio.to_thread(
-                    cdm.get_license_challenge, cdm_session, pssh_obj
-                )
-            ).decode()
-            license = await self.apple_music_api.get_license_exchange(
-                track_id,
-                track_uri,
-                challenge,
-            )
+        if self.key_store and (decryption_key := self.key_store.get(track_uri)):
+            logger.debug(f"Decryption key from key store: {decryption_key}")
+            return decryption_key
 
-            await asyncio.to_thread(cdm.parse_license, cdm_session, license["license"])
-            decryption_key_info = next(
-                i for i in cdm.get_keys(cdm_session) if i.type == "CONTENT"
-            )
-        finally:
-            cdm.close(cdm_session)
+        decryption_key_info = await cdm_session_pool.get_content_key(
+            PSSH(track_uri.split(",")[-1]),
+            functools.partial(self.get_license, track_id, track_uri),
+        )
 
         decryption_key = DecryptionKey(
             key=decryption_key_info.key.hex(),
@@ -72,6 +80,9 @@ class AppleMusicInterface:
         )
         logger.debug(f"Decryption key: {decryption_key}")
 
+        if self.key_store:
+            self.key_store.set(track_uri, decryption_key)
+
         return decryption_key
 
     def get_cover_url_template(self, metadata: dict, cover_format: CoverFormat) -> str:
@@ -142,6 +153,16 @@ class AppleMusicInterface:
             return response.content
         return None
 
+    @alru_cache()
+    async def get_album(
+        self,
+        collection_id: int,
+    ) -> dict | None:
+        album_response = await self.apple_music_api.get_album(collection_id)
+        if not album_response:
+            return None
+        return album_response["data"][0]
+
     @alru_cache()
     async def get_media_date(
         self,
@@ -1,13 +1,13 @@
 import logging
+import time
 import urllib.parse
 
 import m3u8
-from async_lru import alru_cache
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
-from pywidevine import Cdm
 
-from ..utils import get_response
+from ..utils import gather_or_cancel, get_response
+from .cdm_session_pool import CdmSessionPool
 from .constants import MP4_FORMAT_CODECS
 from .enums import MediaRating, MediaType, MusicVideoCodec, MusicVideoResolution
 from .interface import AppleMusicInterface
@@ -61,16 +61,6 @@ class AppleMusicMusicVideoInterface(AppleMusicInterface):
 
         return alt_id
 
-    @alru_cache()
-    async def get_album(
-        self,
-        collection_id: int,
-    ) -> dict | None:
-        album_response = await self.apple_music_api.get_album(collection_id)
-        if not album_response:
-            return None
-        return album_response["data"][0]
-
     async def get_tags(
         self,
         metadata: dict,
@@ -359,19 +349,27 @@ class AppleMusicMusicVideoInterface(AppleMusicInterface):
     async def get_decryption_key(
         self,
         stream_info: StreamInfoAv,
-        cdm: Cdm,
+        cdm_session_pool: CdmSessionPool,
     ) -> DecryptionKeyAv:
-        decryption_key_video = await AppleMusicInterface.get_decryption_key(
-            self,
-            stream_info.video_track.widevine_pssh,
-            stream_info.media_id,
-            cdm,
+        start_time = time.perf_counter()
+
+        decryption_key_video, decryption_key_audio = await gather_or_cancel(
+            AppleMusicInterface.get_decryption_key(
+                self,
+                stream_info.video_track.widevine_pssh,
+                stream_info.media_id,
+                cdm_session_pool,
+            ),
+            AppleMusicInterface.get_decryption_key(
+                self,
+                stream_info.audio_track.widevine_pssh,
+                stream_info.media_id,
+                cdm_session_pool,
+            ),
         )
-        decryption_key_audio = await AppleMusicInterface.get_decryption_key(
-            self,
-            stream_info.audio_track.widevine_pssh,
-            stream_info.media_id,
-            cdm,
+
+        logger.debug(
+            f"Got music video decryption keys in {time.perf_counter() - start_time:.2f}s"
         )
 
         return DecryptionKeyAv(
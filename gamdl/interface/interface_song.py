@@ -1,10 +1,11 @@
-import asyncio
 import base64
 import datetime
+import functools
 import io
 import json
 import logging
 import re
+import urllib.parse
 from xml.dom import minidom
 from xml.etree import ElementTree
 
@@ -12,11 +13,19 @@ import m3u8
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from mutagen.mp4 import MP4
-from pywidevine import PSSH, Cdm
+from pywidevine import PSSH
 from pywidevine.license_protocol_pb2 import WidevinePsshData
 
-from ..utils import get_response
-from .constants import DRM_DEFAULT_KEY_MAPPING, MP4_FORMAT_CODECS, SONG_CODEC_REGEX_MAP
+from ..utils import get_response, safe_gather
+from .cdm_session_pool import CdmSessionPool
+from .constants import (
+    CATALOG_CONTENT_RATING_MAP,
+    CATALOG_TAGS_REQUIRED_FIELDS,
+    DRM_DEFAULT_KEY_MAPPING,
+    LYRICS_BATCH_SIZE,
+    MP4_FORMAT_CODECS,
+    SONG_CODEC_REGEX_MAP,
+)
 from .enums import MediaRating, MediaType, SongCodec, SyncedLyricsFormat
 from .interface import AppleMusicInterface
 from .types import (
@@ -36,6 +45,47 @@ class AppleMusicSongInterface(AppleMusicInterface):
     def __init__(self, interface: AppleMusicInterface):
         self.__dict__.update(interface.__dict__)
 
+    async def hydrate_lyrics(self, tracks_metadata: list[dict]) -> None:
+        tracks_by_id = {}
+        for track_metadata in tracks_metadata:
+            if (
+                track_metadata["type"] not in {"songs", "library-songs"}
+                or not track_metadata.get("attributes", {}).get("hasLyrics")
+                or "lyrics" in track_metadata.get("relationships", {})
+            ):
+                continue
+            tracks_by_id.setdefault(
+                self.get_media_id_of_library_media(track_metadata), []
+            ).append(track_metadata)
+
+        song_ids = list(tracks_by_id.keys())
+        songs_responses = await safe_gather(
+            *(
+                self.apple_music_api.get_songs(song_ids[i : i + LYRICS_BATCH_SIZE])
+                for i in range(0, len(song_ids), LYRICS_BATCH_SIZE)
+            )
+        )
+
+        for songs_response in songs_responses:
+            if isinstance(songs_response, Exception):
+                logger.debug(f"Failed to hydrate lyrics: {songs_response}")
+                continue
+
+            for song_metadata in songs_response["data"]:
+                lyrics_relationship = song_metadata.get("relationships", {}).get(
+                    "lyrics",
+                    {"data": []},
+                )
+                for track_metadata in tracks_by_id.get(song_metadata["id"], []):
+                    track_metadata.setdefault("relationships", {})[
+                        "lyrics"
+                    ] = lyrics_relationship
+
+        logger.debug(
+            f"Hydrated lyrics for {len(song_ids)} tracks "
+            f"in {len(songs_responses)} requests"
+        )
+
     async def get_lyrics(
         self,
         song_metadata: dict,
@@ -225,6 +275,81 @@ class AppleMusicSongInterface(AppleMusicInterface):
 
         return tags
 
+    async def get_tags_catalog(
+        self,
+        song_metadata: dict,
+        lyrics: str | None = None,
+        use_album_date: bool = False,
+    ) -> MediaTags | None:
+        if song_metadata["type"] != "songs":
+            return None
+
+        attributes = song_metadata["attributes"]
+        album_relationship = (
+            song_metadata.get("relationships", {}).get("albums", {}).get("data")
+        )
+        album_id = (
+            album_relationship[0]["id"]
+            if album_relationship
+            else urllib.parse.urlparse(attributes.get("url", "")).path.split("/")[-1]
+        )
+        album = await self.get_album(album_id) if album_id.isdigit() else None
+        if not album:
+            logger.debug(f"Album not found for catalog tags of {song_metadata['id']}")
+            return None
+        album_attributes = album["attributes"]
+        album_tracks = album.get("relationships", {}).get("tracks", {}).get("data", [])
+
+        tags = MediaTags(
+            album=attributes.get("albumName"),
+            album_artist=album_attributes.get("artistName"),
+            album_id=int(album["id"]),
+            artist=attributes.get("artistName"),
+            compilation=album_attributes.get("isCompilation"),
+            composer=attributes.get("composerName"),
+            copyright=album_attributes.get("copyright"),
+            date=(
+                await self.get_media_date(album["id"])
+                if use_album_date
+                else (
+                    self.parse_date(attributes["releaseDate"])
+                    if attributes.get("releaseDate")
+                    else None
+                )
+            ),
+            disc=attributes.get("discNumber"),
+            disc_total=max(
+                (
+                    track["attributes"].get("discNumber", 1)
+                    for track in album_tracks
+                    if track.get("attributes")
+                ),
+                default=None,
+            ),
+            genre=next(iter(attributes.get("genreNames", [])), None),
+            lyrics=lyrics if lyrics else None,
+            media_type=MediaType.SONG,
+            rating=MediaRating(
+                CATALOG_CONTENT_RATING_MAP.get(attributes.get("contentRating"), 0)
+            ),
+            storefront=int(self.itunes_api.storefront_id.split("-")[0]),
+            title=attributes.get("name"),
+            title_id=int(song_metadata["id"]),
+            track=attributes.get("trackNumber"),
+            track_total=album_attributes.get("trackCount"),
+        )
+
+        missing_fields = [
+            field for field in CATALOG_TAGS_REQUIRED_FIELDS if getattr(tags, field) is None
+        ]
+        if missing_fields:
+            logger.debug(f"Catalog tags missing {missing_fields}: {tags}")
+            return None
+
+        logger.debug(f"Tags: {tags}")
+
+        return tags
+
     async def get_stream_info(
         self,
         song_metadata: dict,
@@ -406,40 +531,31 @@ class AppleMusicSongInterface(AppleMusicInterface):
     async def get_decryption_key_legacy(
         self,
         stream_info: StreamInfoAv,
-        cdm: Cdm,
+        cdm_session_pool: CdmSessionPool,
     ) -> DecryptionKeyAv:
         stream_info_audio = stream_info.audio_track
 
-        try:
-            cdm_session = cdm.open()
+        if self.key_store and (
+            decryption_key := self.key_store.get(stream_info_audio.widevine_pssh)
+        ):
+            logger.debug(f"Decryption key legacy from key store: {decryption_key}")
+            return DecryptionKeyAv(audio_track=decryption_key)
 
-            widevine_pssh_data = WidevinePsshData()
-            widevine_pssh_data.algorithm = 1
-            widevine_pssh_data.key_ids.append(
-                base64.b64decode(stream_info_audio.widevine_pssh.split(",")[1])
-            )
-            pssh_obj = PSSH(widevine_pssh_data.SerializeToString())
+        widevine_pssh_data = WidevinePsshData()
+        widevine_pssh_data.algorithm = 1
+        widevine_pssh_data.key_ids.append(
+            base64.b64decode(stream_info_audio.widevine_pssh.split(",")[1])
+        )
+        pssh_obj = PSSH(widevine_pssh_data.SerializeToString())
 
-            challenge = base64.b64encode(
-                await asyncio.to_thread(
-                    cdm.get_license_challenge, cdm_session, pssh_obj
-                )
-            ).decode()
-            license_response = await self.apple_music_api.get_license_exchange(
+        decryption_key = await cdm_session_pool.get_content_key(
+            pssh_obj,
+            functools.partial(
+                self.get_license,
                 stream_info.media_id,
-                stream_info.audio_track.widevine_pssh,
-                challenge,
-            )
-
-            await asyncio.to_thread(
-                cdm.parse_license, cdm_session, license_response["license"]
-            )
-
-            decryption_key = next(
-                i for i in cdm.get_keys(cdm_session) if i.type == "CONTENT"
-            )
-        finally:
-            cdm.close(cdm_session)
+                stream_info_audio.widevine_pssh,
+            ),
+        )
 
         decryption_key = DecryptionKeyAv(
             audio_track=DecryptionKey(
@@ -449,19 +565,25 @@ class AppleMusicSongInterface(AppleMusicInterface):
         )
         logger.debug(f"Decryption key legacy: {decryption_key}")
 
+        if self.key_store:
+            self.key_store.set(
+                stream_info_audio.widevine_pssh,
+                decryption_key.audio_track,
+            )
+
         return decryption_key
 
     async def get_decryption_key(
         self,
         stream_info: StreamInfoAv,
-        cdm: Cdm,
+        cdm_session_pool: CdmSessionPool,
     ) -> DecryptionKeyAv:
         return DecryptionKeyAv(
             audio_track=await AppleMusicInterface.get_decryption_key(
                 self,
                 stream_info.audio_track.widevine_pssh,
                 stream_info.media_id,
-                cdm,
+                cdm_session_pool,
             )
         )
 
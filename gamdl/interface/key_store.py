@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import os
+import secrets
+import sqlite3
+import time
+from pathlib import Path
+
+from Crypto.Cipher import AES
+
+from .constants import KEY_STORE_SECRET_SIZE, KEY_STORE_TTL
+from .types import DecryptionKey
+
+logger = logging.getLogger(__name__)
+
+
+class KeyStore:
+    def __init__(
+        self,
+        store_path: str,
+        secret_path: str | None = None,
+        ttl: int = KEY_STORE_TTL,
+    ) -> None:
+        self.store_path = store_path
+        self.secret_path = secret_path or f"{store_path}.secret"
+        self.ttl = ttl
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+        }
+        self.initialize()
+
+    def initialize(self) -> None:
+        Path(self.store_path).parent.mkdir(parents=True, exist_ok=True)
+        self.secret = self._load_secret()
+        self.connection = sqlite3.connect(self.store_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS keys ("
+            "pssh_hash TEXT PRIMARY KEY, "
+            "nonce BLOB NOT NULL, "
+            "ciphertext BLOB NOT NULL, "
+            "tag BLOB NOT NULL, "
+            "expires REAL NOT NULL)"
+        )
+        self.connection.commit()
+        self.purge(expired_only=True)
+
+    def _load_secret(self) -> bytes:
+        secret_path = Path(self.secret_path)
+        if secret_path.exists():
+            secret = secret_path.read_bytes()
+            if len(secret) != KEY_STORE_SECRET_SIZE:
+                raise Exception(f"Invalid key store secret at {secret_path}")
+            return secret
+
+        secret = secrets.token_bytes(KEY_STORE_SECRET_SIZE)
+        secret_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(secret_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as secret_file:
+            secret_file.write(secret)
+        logger.debug(f"Created key store secret at {secret_path}")
+        return secret
+
+    @staticmethod
+    def get_pssh_hash(pssh: str) -> str:
+        return hashlib.sha256(pssh.encode()).hexdigest()
+
+    def get(self, pssh: str) -> DecryptionKey | None:
+        pssh_hash = self.get_pssh_hash(pssh)
+        row = self.connection.execute(
+            "SELECT nonce, ciphertext, tag FROM keys "
+            "WHERE pssh_hash = ? AND expires > ?",
+            (pssh_hash, time.time()),
+        ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        nonce, ciphertext, tag = row
+        cipher = AES.new(self.secret, AES.MODE_GCM, nonce=nonce)
+        cipher.update(pssh_hash.encode())
+        try:
+            kid, key = cipher.decrypt_and_verify(ciphertext, tag).decode().split(":")
+        except ValueError:
+            logger.debug(f"Discarding unreadable key store entry {pssh_hash}")
+            self.delete(pssh_hash)
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return DecryptionKey(kid=kid, key=key)
+
+    def set(self, pssh: str, decryption_key: DecryptionKey) -> None:
+        pssh_hash = self.get_pssh_hash(pssh)
+        cipher = AES.new(self.secret, AES.MODE_GCM)
+        cipher.update(pssh_hash.encode())
+        ciphertext, tag = cipher.encrypt_and_digest(
+            f"{decryption_key.kid}:{decryption_key.key}".encode()
+        )
+        self.connection.execute(
+            "INSERT OR REPLACE INTO keys (pssh_hash, nonce, ciphertext, tag, expires) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (pssh_hash, cipher.nonce, ciphertext, tag, time.time() + self.ttl),
+        )
+        self.connection.commit()
+        self.stats["stores"] += 1
+
+    def delete(self, pssh_hash: str) -> None:
+        self.connection.execute("DELETE FROM keys WHERE pssh_hash = ?", (pssh_hash,))
+        self.connection.commit()
+
+    def purge(self, expired_only: bool = False) -> int:
+        if expired_only:
+            cursor = self.connection.execute(
+                "DELETE FROM keys WHERE expires <= ?",
+                (time.time(),),
+            )
+        else:
+            cursor = self.connection.execute("DELETE FROM keys")
+        self.connection.commit()
+
+        logger.debug(f"Purged {cursor.rowcount} key store entries")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        logger.debug(f"Key store stats: {self.stats}")
+        self.connection.close()
@@ -1,3 +1,4 @@
+import typing
 from pathlib import Path
 from mutagen.id3 import (
     APIC,
@@ -19,7 +20,7 @@ from mutagen.id3 import (
 class MP3Tagger:
     @staticmethod
     def apply(
-        media_path: Path,
+        media_path: Path | typing.BinaryIO,
         tags: dict,
         cover_bytes: bytes | None,
         skip_tagging: bool,
@@ -1,3 +1,4 @@
+import typing
 from pathlib import Path
 from mutagen.mp4 import MP4, MP4Cover
 from ..interface.enums import CoverFormat
@@ -6,7 +7,7 @@ from ..interface.enums import CoverFormat
 class MP4Tagger:
     @staticmethod
     def apply(
-        media_path: Path,
+        media_path: Path | typing.BinaryIO,
         tags: dict,
         cover_bytes: bytes | None,
         skip_tagging: bool,
@@ -36,4 +37,4 @@ class MP4Tagger:
             if extra_tags:
                 mp4.update(extra_tags)
 
-        mp4.save()
+        mp4.save(media_path)
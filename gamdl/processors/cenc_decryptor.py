@@ -0,0 +1,455 @@
+import struct
+import typing
+from dataclasses import dataclass, field
+
+from Crypto.Cipher import AES
+
+from .mp4_boxes import (
+    PIFF_SAMPLE_ENCRYPTION_UUID,
+    Box,
+    find_box,
+    find_box_path,
+    get_full_box_flags,
+    get_sample_entry_children_offset,
+    get_uuid,
+    iter_boxes,
+    read_box_header,
+    rename_box,
+)
+
+SUPPORTED_SCHEME_TYPES = {b"cenc", b"cbcs"}
+
+
+@dataclass
+class SampleEncryption:
+    scheme_type: bytes
+    kid: bytes
+    key: bytes | None
+    per_sample_iv_size: int
+    constant_iv: bytes | None = None
+    crypt_byte_block: int = 0
+    skip_byte_block: int = 0
+
+
+@dataclass
+class TrackEncryption:
+    sample_encryptions: dict[int, SampleEncryption] = field(default_factory=dict)
+    default_sample_description_index: int = 1
+    default_sample_size: int = 0
+
+
+class CencDecryptor:
+    def __init__(
+        self,
+        keys: dict[bytes, bytes],
+        default_key: bytes | None = None,
+    ):
+        self.keys = keys
+        self.default_key = default_key
+        self.tracks: dict[int, TrackEncryption] = {}
+        self.stream_buffer = bytearray()
+        self.stream_offset = 0
+
+    def decrypt_buffer(self, data: typing.Any, file_offset: int = 0) -> None:
+        for box in iter_boxes(data):
+            if box.type == b"moov":
+                self.process_moov(data, box)
+            elif box.type == b"moof":
+                self.decrypt_fragment(data, box, file_offset)
+
+    def decrypt_chunk(self, chunk: bytes) -> bytes:
+        self.stream_buffer += chunk
+        decrypted = bytearray()
+        while (unit_size := self._get_stream_unit_size()) is not None:
+            decrypted += self._decrypt_stream_unit(unit_size)
+        return bytes(decrypted)
+
+    def flush(self) -> bytes:
+        return bytes(self._decrypt_stream_unit(len(self.stream_buffer)))
+
+    def _decrypt_stream_unit(self, unit_size: int) -> bytearray:
+        unit = self.stream_buffer[:unit_size]
+        del self.stream_buffer[:unit_size]
+        self.decrypt_buffer(unit, self.stream_offset)
+        self.stream_offset += unit_size
+        return unit
+
+    def _get_stream_unit_size(self) -> int | None:
+        box = self._read_stream_box(0)
+        if box is None:
+            return None
+        if box.type != b"moof":
+            return box.size
+
+        # Fragment samples live in the box following the moof, so both must be
+        # buffered before the fragment can be decrypted
+        mdat = self._read_stream_box(box.end)
+        if mdat is None:
+            return None
+        return mdat.end
+
+    def _read_stream_box(self, offset: int) -> Box | None:
+        if offset + 8 > len(self.stream_buffer):
+            return None
+        if struct.unpack_from(">I", self.stream_buffer, offset)[0] == 0:
+            return None
+
+        box = read_box_header(self.stream_buffer, offset, len(self.stream_buffer))
+        if box is None or box.end > len(self.stream_buffer):
+            return None
+        return box
+
+    def process_moov(self, data: typing.Any, moov: Box) -> None:
+        for box in iter_boxes(data, moov.payload_offset, moov.end):
+            if box.type == b"trak":
+                self._process_trak(data, box)
+            elif box.type == b"mvex":
+                self._process_mvex(data, box)
+            elif box.type == b"pssh":
+                rename_box(data, box, b"free")
+
+    def _process_trak(self, data: typing.Any, trak: Box) -> None:
+        tkhd = find_box(data, b"tkhd", trak.payload_offset, trak.end)
+        track_id = struct.unpack_from(
+            ">I",
+            data,
+            tkhd.payload_offset + (20 if data[tkhd.payload_offset] == 1 else 12),
+        )[0]
+
+        hdlr = find_box_path(data, trak, [b"mdia", b"hdlr"])
+        stsd = find_box_path(data, trak, [b"mdia", b"minf", b"stbl", b"stsd"])
+        if hdlr is None or stsd is None:
+            return
+        handler_type = bytes(data[hdlr.payload_offset + 8 : hdlr.payload_offset + 12])
+
+        track = self.tracks.setdefault(track_id, TrackEncryption())
+        for sample_description_index, sample_entry in enumerate(
+            iter_boxes(data, stsd.payload_offset + 8, stsd.end),
+            1,
+        ):
+            children_offset = get_sample_entry_children_offset(
+                data,
+                sample_entry,
+                handler_type,
+            )
+            if children_offset is None:
+                continue
+
+            sinf = find_box(data, b"sinf", children_offset, sample_entry.end)
+            if sinf is None:
+                continue
+
+            track.sample_encryptions[sample_description_index] = self._process_sinf(
+                data,
+                sample_entry,
+                sinf,
+            )
+
+    def _process_sinf(
+        self,
+        data: typing.Any,
+        sample_entry: Box,
+        sinf: Box,
+    ) -> SampleEncryption:
+        frma = find_box(data, b"frma", sinf.payload_offset, sinf.end)
+        schm = find_box(data, b"schm", sinf.payload_offset, sinf.end)
+        tenc = find_box_path(data, sinf, [b"schi", b"tenc"])
+        if frma is None or schm is None or tenc is None:
+            raise Exception("Incomplete protection scheme information in sample entry")
+
+        scheme_type = bytes(data[schm.payload_offset + 4 : schm.payload_offset + 8])
+        if scheme_type not in SUPPORTED_SCHEME_TYPES:
+            raise Exception(f"Unsupported protection scheme: {scheme_type.decode()}")
+
+        version = data[tenc.payload_offset]
+        pattern = data[tenc.payload_offset + 5] if version > 0 else 0
+        is_protected = data[tenc.payload_offset + 6]
+        per_sample_iv_size = data[tenc.payload_offset + 7]
+        kid = bytes(data[tenc.payload_offset + 8 : tenc.payload_offset + 24])
+
+        constant_iv = None
+        if is_protected and per_sample_iv_size == 0:
+            constant_iv_size = data[tenc.payload_offset + 24]
+            constant_iv = bytes(
+                data[
+                    tenc.payload_offset + 25 : tenc.payload_offset + 25 + constant_iv_size
+                ]
+            )
+
+        rename_box(data, sample_entry, bytes(data[frma.payload_offset : frma.end]))
+        rename_box(data, sinf, b"free")
+
+        return SampleEncryption(
+            scheme_type=scheme_type,
+            kid=kid,
+            key=self.keys.get(kid, self.default_key) if is_protected else None,
+            per_sample_iv_size=per_sample_iv_size,
+            constant_iv=constant_iv,
+            crypt_byte_block=pattern >> 4,
+            skip_byte_block=pattern & 0x0F,
+        )
+
+    def _process_mvex(self, data: typing.Any, mvex: Box) -> None:
+        for trex in iter_boxes(data, mvex.payload_offset, mvex.end):
+            if trex.type != b"trex":
+                continue
+
+            track_id, sample_description_index, _, sample_size = struct.unpack_from(
+                ">IIII",
+                data,
+                trex.payload_offset + 4,
+            )
+            track = self.tracks.setdefault(track_id, TrackEncryption())
+            track.default_sample_description_index = sample_description_index
+            track.default_sample_size = sample_size
+
+    def decrypt_fragment(
+        self,
+        data: typing.Any,
+        moof: Box,
+        file_offset: int = 0,
+    ) -> None:
+        for traf in iter_boxes(data, moof.payload_offset, moof.end):
+            if traf.type == b"traf":
+                self._decrypt_traf(data, moof, traf, file_offset)
+
+    def _decrypt_traf(
+        self,
+        data: typing.Any,
+        moof: Box,
+        traf: Box,
+        file_offset: int,
+    ) -> None:
+        tfhd = find_box(data, b"tfhd", traf.payload_offset, traf.end)
+        tfhd_flags = get_full_box_flags(data, tfhd)
+        track_id = struct.unpack_from(">I", data, tfhd.payload_offset + 4)[0]
+
+        track = self.tracks.get(track_id)
+        if track is None or not track.sample_encryptions:
+            return
+
+        offset = tfhd.payload_offset + 8
+        base_data_offset = moof.offset
+        if tfhd_flags & 0x01:
+            base_data_offset = struct.unpack_from(">Q", data, offset)[0] - file_offset
+            offset += 8
+        sample_description_index = track.default_sample_description_index
+        if tfhd_flags & 0x02:
+            sample_description_index = struct.unpack_from(">I", data, offset)[0]
+            offset += 4
+        if tfhd_flags & 0x08:
+            offset += 4
+        default_sample_size = track.default_sample_size
+        if tfhd_flags & 0x10:
+            default_sample_size = struct.unpack_from(">I", data, offset)[0]
+
+        sample_encryption = track.sample_encryptions.get(sample_description_index)
+        if sample_encryption is None or sample_encryption.key is None:
+            return
+
+        samples = self._get_samples(data, traf, base_data_offset, default_sample_size)
+        sample_infos = self._get_sample_infos(
+            data,
+            traf,
+            sample_encryption,
+            len(samples),
+        )
+        for (sample_offset, sample_size), (iv, subsamples) in zip(
+            samples,
+            sample_infos,
+        ):
+            self._decrypt_sample(
+                data,
+                sample_offset,
+                sample_size,
+                iv,
+                subsamples,
+                sample_encryption,
+            )
+
+        self._remove_sample_encryption_boxes(data, traf)
+
+    def _get_samples(
+        self,
+        data: typing.Any,
+        traf: Box,
+        base_data_offset: int,
+        default_sample_size: int,
+    ) -> list[tuple[int, int]]:
+        samples = []
+        next_sample_offset = base_data_offset
+
+        for trun in iter_boxes(data, traf.payload_offset, traf.end):
+            if trun.type != b"trun":
+                continue
+
+            trun_flags = get_full_box_flags(data, trun)
+            sample_count = struct.unpack_from(">I", data, trun.payload_offset + 4)[0]
+            offset = trun.payload_offset + 8
+
+            sample_offset = next_sample_offset
+            if trun_flags & 0x01:
+                sample_offset = (
+                    base_data_offset + struct.unpack_from(">i", data, offset)[0]
+                )
+                offset += 4
+            if trun_flags & 0x04:
+                offset += 4
+
+            for _ in range(sample_count):
+                if trun_flags & 0x100:
+                    offset += 4
+                sample_size = default_sample_size
+                if trun_flags & 0x200:
+                    sample_size = struct.unpack_from(">I", data, offset)[0]
+                    offset += 4
+                if trun_flags & 0x400:
+                    offset += 4
+                if trun_flags & 0x800:
+                    offset += 4
+
+                samples.append((sample_offset, sample_size))
+                sample_offset += sample_size
+
+            next_sample_offset = sample_offset
+
+        return samples
+
+    def _get_sample_infos(
+        self,
+        data: typing.Any,
+        traf: Box,
+        sample_encryption: SampleEncryption,
+        sample_count: int,
+    ) -> list[tuple[bytes, list[tuple[int, int]] | None]]:
+        senc = next(
+            (
+                box
+                for box in iter_boxes(data, traf.payload_offset, traf.end)
+                if box.type == b"senc"
+                or (
+                    box.type == b"uuid"
+                    and get_uuid(data, box) == PIFF_SAMPLE_ENCRYPTION_UUID
+                )
+            ),
+            None,
+        )
+        if senc is None:
+            if sample_encryption.per_sample_iv_size:
+                raise Exception("Sample encryption information not found in fragment")
+            return [(sample_encryption.constant_iv, None)] * sample_count
+
+        senc_flags = get_full_box_flags(data, senc)
+        iv_size = sample_encryption.per_sample_iv_size
+        offset = senc.payload_offset + 8
+
+        sample_infos = []
+        for _ in range(struct.unpack_from(">I", data, senc.payload_offset + 4)[0]):
+            iv = (
+                bytes(data[offset : offset + iv_size])
+                if iv_size
+                else sample_encryption.constant_iv
+            )
+            offset += iv_size
+
+            subsamples = None
+            if senc_flags & 0x02:
+                subsample_count = struct.unpack_from(">H", data, offset)[0]
+                offset += 2
+                subsamples = [
+                    struct.unpack_from(">HI", data, offset + 6 * i)
+                    for i in range(subsample_count)
+                ]
+                offset += 6 * subsample_count
+
+            sample_infos.append((iv, subsamples))
+
+        return sample_infos
+
+    def _decrypt_sample(
+        self,
+        data: typing.Any,
+        sample_offset: int,
+        sample_size: int,
+        iv: bytes,
+        subsamples: list[tuple[int, int]] | None,
+        sample_encryption: SampleEncryption,
+    ) -> None:
+        iv = iv.ljust(16, b"\x00")
+        protected_ranges = []
+        position = sample_offset
+        for clear_size, protected_size in subsamples or [(0, sample_size)]:
+            position += clear_size
+            protected_ranges.append((position, protected_size))
+            position += protected_size
+
+        if sample_encryption.scheme_type == b"cenc":
+            cipher = AES.new(
+                sample_encryption.key,
+                AES.MODE_CTR,
+                nonce=b"",
+                initial_value=iv,
+            )
+            for position, protected_size in protected_ranges:
+                data[position : position + protected_size] = cipher.decrypt(
+                    data[position : position + protected_size]
+                )
+        else:
+            for position, protected_size in protected_ranges:
+                self._decrypt_cbcs_range(
+                    data,
+                    position,
+                    protected_size,
+                    iv,
+                    sample_encryption,
+                )
+
+    def _decrypt_cbcs_range(
+        self,
+        data: typing.Any,
+        position: int,
+        protected_size: int,
+        iv: bytes,
+        sample_encryption: SampleEncryption,
+    ) -> None:
+        if not sample_encryption.skip_byte_block:
+            protected_size -= protected_size % 16
+            if protected_size:
+                data[position : position + protected_size] = AES.new(
+                    sample_encryption.key,
+                    AES.MODE_CBC,
+                    iv,
+                ).decrypt(data[position : position + protected_size])
+            return
+
+        crypt_size = 16 * sample_encryption.crypt_byte_block
+        pattern_size = 16 * (
+            sample_encryption.crypt_byte_block + sample_encryption.skip_byte_block
+        )
+        block_offsets = range(
+            position,
+            position + protected_size - crypt_size + 1,
+            pattern_size,
+        )
+        if not block_offsets:
+            return
+
+        decrypted = AES.new(sample_encryption.key, AES.MODE_CBC, iv).decrypt(
+            b"".join(data[offset : offset + crypt_size] for offset in block_offsets)
+        )
+        for index, offset in enumerate(block_offsets):
+            data[offset : offset + crypt_size] = decrypted[
+                index * crypt_size : (index + 1) * crypt_size
+            ]
+
+    def _remove_sample_encryption_boxes(self, data: typing.Any, traf: Box) -> None:
+        for box in iter_boxes(data, traf.payload_offset, traf.end):
+            if box.type in {b"senc", b"saiz", b"saio"} or (
+                box.type == b"uuid"
+                and get_uuid(data, box) == PIFF_SAMPLE_ENCRYPTION_UUID
+            ):
+                rename_box(data, box, b"free")
+            elif box.type in {b"sbgp", b"sgpd"} and (
+                data[box.payload_offset + 4 : box.payload_offset + 8] == b"seig"
+            ):
+                rename_box(data, box, b"free")
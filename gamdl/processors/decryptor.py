@@ -1,6 +1,12 @@
+import asyncio
+import mmap
+import typing
 from pathlib import Path
 from ..utils import async_subprocess
 from ..downloader.constants import DEFAULT_SONG_DECRYPTION_KEY
+from ..downloader.enums import DecryptMode
+from .cenc_decryptor import CencDecryptor
+from .mp4_boxes import find_box, iter_boxes, iter_tenc_boxes
 
 
 class Decryptor:
@@ -9,24 +15,123 @@ class Decryptor:
         mp4decrypt_path: str,
         amdecrypt_path: str,
         silent: bool = False,
+        decrypt_mode: DecryptMode = DecryptMode.MP4DECRYPT,
     ):
         self.mp4decrypt_path = mp4decrypt_path
         self.amdecrypt_path = amdecrypt_path
         self.silent = silent
+        self.decrypt_mode = decrypt_mode
 
     def fix_key_id(self, input_path: str):
-        count = 0
-        with open(input_path, "rb+") as file:
-            while data := file.read(4096):
-                pos = file.tell()
-                i = 0
-                while tenc := max(0, data.find(b"tenc", i)):
-                    kid = tenc + 12
-                    file.seek(max(0, pos - 4096) + kid, 0)
-                    file.write(bytes.fromhex(f"{count:032}"))
-                    count += 1
-                    i = kid + 1
-                file.seek(pos, 0)
+        with open(input_path, "rb+") as file, mmap.mmap(file.fileno(), 0) as data:
+            self.fix_key_id_buffer(data)
+
+    def fix_key_id_buffer(self, data: bytearray | mmap.mmap):
+        moov = find_box(data, b"moov")
+        if moov is None:
+            return
+
+        for count, tenc in enumerate(iter_tenc_boxes(data, moov)):
+            kid = tenc.payload_offset + 8
+            data[kid : kid + 16] = bytes.fromhex(f"{count:032}")
+
+    def get_cenc_decryptor(self, decryption_key: str, legacy: bool) -> CencDecryptor:
+        if legacy:
+            return CencDecryptor({}, bytes.fromhex(decryption_key))
+
+        return CencDecryptor(
+            {
+                bytes.fromhex("0" * 31 + "1"): bytes.fromhex(decryption_key),
+                bytes.fromhex("0" * 32): bytes.fromhex(DEFAULT_SONG_DECRYPTION_KEY),
+            }
+        )
+
+    async def decrypt(
+        self,
+        input_path: str,
+        output_path: str,
+        decryption_key: str,
+        legacy: bool,
+    ):
+        if self.decrypt_mode == DecryptMode.NATIVE:
+            await self.decrypt_native(
+                input_path,
+                output_path,
+                decryption_key,
+                legacy,
+            )
+        else:
+            await self.decrypt_mp4decrypt(
+                input_path,
+                output_path,
+                decryption_key,
+                legacy,
+            )
+
+    async def decrypt_native(
+        self,
+        input_path: str,
+        output_path: str,
+        decryption_key: str,
+        legacy: bool,
+    ):
+        await asyncio.to_thread(
+            self._decrypt_native_file,
+            input_path,
+            output_path,
+            decryption_key,
+            legacy,
+        )
+
+    def _decrypt_native_file(
+        self,
+        input_path: str,
+        output_path: str,
+        decryption_key: str,
+        legacy: bool,
+    ):
+        # The input is only read, so a failed decrypt can be retried from it
+        cenc_decryptor = self.get_cenc_decryptor(decryption_key, legacy)
+        with (
+            open(input_path, "rb") as input_file,
+            mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            open(output_path, "wb") as output_file,
+        ):
+            for box in iter_boxes(data):
+                unit = bytearray(data[box.offset : box.end])
+                if box.type == b"moov" and not legacy:
+                    self.fix_key_id_buffer(unit)
+                output_file.write(cenc_decryptor.decrypt_chunk(unit))
+            output_file.write(cenc_decryptor.flush())
+
+    async def decrypt_native_buffer(
+        self,
+        data: bytearray,
+        decryption_key: str,
+        legacy: bool,
+    ):
+        if not legacy:
+            self.fix_key_id_buffer(data)
+
+        await asyncio.to_thread(
+            self.get_cenc_decryptor(decryption_key, legacy).decrypt_buffer,
+            data,
+        )
+
+    async def decrypt_native_stream(
+        self,
+        segments: typing.AsyncIterator[bytes],
+        output_path: str,
+        decryption_key: str,
+    ):
+        cenc_decryptor = self.get_cenc_decryptor(decryption_key, legacy=True)
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as file:
+            async for segment in segments:
+                file.write(
+                    await asyncio.to_thread(cenc_decryptor.decrypt_chunk, segment)
+                )
+            file.write(cenc_decryptor.flush())
 
     async def decrypt_mp4decrypt(
         self,
@@ -0,0 +1,162 @@
+import struct
+import typing
+
+PIFF_SAMPLE_ENCRYPTION_UUID = bytes.fromhex("a2394f525a9b4f14a2446c427c648df4")
+
+AUDIO_SAMPLE_ENTRY_SIZE = {0: 28, 1: 44, 2: 64}
+VISUAL_SAMPLE_ENTRY_SIZE = 78
+
+
+class Box(typing.NamedTuple):
+    type: bytes
+    offset: int
+    header_size: int
+    size: int
+
+    @property
+    def payload_offset(self) -> int:
+        return self.offset + self.header_size
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
+
+
+def read_box_header(data: typing.Any, offset: int, end: int) -> Box | None:
+    if offset + 8 > end:
+        return None
+
+    size, box_type = struct.unpack_from(">I4s", data, offset)
+    header_size = 8
+    if size == 1:
+        if offset + 16 > end:
+            return None
+        size = struct.unpack_from(">Q", data, offset + 8)[0]
+        header_size = 16
+    elif size == 0:
+        size = end - offset
+
+    if box_type == b"uuid":
+        header_size += 16
+
+    if size < header_size:
+        raise Exception(f"Invalid MP4 box size {size} at offset {offset}")
+
+    return Box(box_type, offset, header_size, size)
+
+
+def iter_boxes(
+    data: typing.Any,
+    start: int = 0,
+    end: int | None = None,
+) -> typing.Iterator[Box]:
+    end = len(data) if end is None else end
+    offset = start
+    while (box := read_box_header(data, offset, end)) is not None:
+        yield box
+        offset = box.end
+
+
+def find_box(
+    data: typing.Any,
+    box_type: bytes,
+    start: int = 0,
+    end: int | None = None,
+) -> Box | None:
+    return next(
+        (box for box in iter_boxes(data, start, end) if box.type == box_type),
+        None,
+    )
+
+
+def find_box_path(
+    data: typing.Any,
+    parent: Box,
+    box_path: list[bytes],
+) -> Box | None:
+    box = parent
+    for box_type in box_path:
+        box = find_box(data, box_type, box.payload_offset, box.end)
+        if box is None:
+            return None
+    return box
+
+
+def iter_tenc_boxes(data: typing.Any, moov: Box) -> typing.Iterator[Box]:
+    for trak in iter_boxes(data, moov.payload_offset, moov.end):
+        if trak.type != b"trak":
+            continue
+
+        hdlr = find_box_path(data, trak, [b"mdia", b"hdlr"])
+        stsd = find_box_path(data, trak, [b"mdia", b"minf", b"stbl", b"stsd"])
+        if hdlr is None or stsd is None:
+            continue
+        handler_type = bytes(data[hdlr.payload_offset + 8 : hdlr.payload_offset + 12])
+
+        for sample_entry in iter_boxes(data, stsd.payload_offset + 8, stsd.end):
+            children_offset = get_sample_entry_children_offset(
+                data,
+                sample_entry,
+                handler_type,
+            )
+            sinf_boxes = (
+                (
+                    box
+                    for box in iter_boxes(data, children_offset, sample_entry.end)
+                    if box.type == b"sinf"
+                )
+                if children_offset is not None
+                else scan_sinf_boxes(data, sample_entry)
+            )
+
+            for sinf in sinf_boxes:
+                tenc = find_box_path(data, sinf, [b"schi", b"tenc"])
+                if tenc is not None:
+                    yield tenc
+
+
+def scan_sinf_boxes(data: typing.Any, sample_entry: Box) -> typing.Iterator[Box]:
+    # The layout of sample entries for other handler types is not known, so
+    # look for sinf headers that fit inside the sample entry instead
+    offset = sample_entry.payload_offset + 8
+    while (position := bytes(data[offset : sample_entry.end]).find(b"sinf")) != -1:
+        box_offset = offset + position - 4
+        offset += position + 4
+        if box_offset < sample_entry.payload_offset + 8:
+            continue
+        try:
+            sinf = read_box_header(data, box_offset, sample_entry.end)
+        except Exception:
+            continue
+        if sinf is not None and sinf.end <= sample_entry.end:
+            yield sinf
+            offset = sinf.end
+
+
+def get_uuid(data: typing.Any, box: Box) -> bytes:
+    return bytes(data[box.payload_offset - 16 : box.payload_offset])
+
+
+def get_full_box_flags(data: typing.Any, box: Box) -> int:
+    return int.from_bytes(data[box.payload_offset + 1 : box.payload_offset + 4], "big")
+
+
+def rename_box(data: typing.Any, box: Box, box_type: bytes) -> None:
+    data[box.offset + 4 : box.offset + 8] = box_type
+
+
+def get_sample_entry_children_offset(
+    data: typing.Any,
+    sample_entry: Box,
+    handler_type: bytes,
+) -> int | None:
+    if handler_type == b"soun":
+        version = struct.unpack_from(">H", data, sample_entry.payload_offset + 8)[0]
+        if version not in AUDIO_SAMPLE_ENTRY_SIZE:
+            return None
+        return sample_entry.payload_offset + AUDIO_SAMPLE_ENTRY_SIZE[version]
+
+    if handler_type == b"vide":
+        return sample_entry.payload_offset + VISUAL_SAMPLE_ENTRY_SIZE
+
+    return None
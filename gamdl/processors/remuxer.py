@@ -64,6 +64,48 @@ class Remuxer:
             silent=self.silent,
         )
 
+    async def remux_ffmpeg_buffer(
+        self,
+        input_bytes: bytes,
+        mp3_bitrate: str = None,
+    ) -> bytes:
+        if mp3_bitrate:
+            output_args = [
+                "-codec:a",
+                "libmp3lame",
+                "-b:a",
+                mp3_bitrate,
+                "-id3v2_version",
+                "3",
+                "-f",
+                "mp3",
+            ]
+        else:
+            # stdout can't seek, so write a fragmented MP4 with the moov up front
+            output_args = [
+                "-c",
+                "copy",
+                "-movflags",
+                "+empty_moov+default_base_moof",
+                "-frag_duration",
+                "10000000",
+                "-f",
+                "ipod",
+            ]
+
+        return await async_subprocess(
+            self.ffmpeg_path,
+            "-loglevel",
+            "error",
+            "-i",
+            "pipe:0",
+            *output_args,
+            "pipe:1",
+            silent=self.silent,
+            input_bytes=input_bytes,
+            capture_output=True,
+        )
+
     async def remux_mp4box(self, input_paths: List[Union[str, Path]], output_path: Union[str, Path], silent: bool = False):
         inputs = []
         for p in input_paths:
@@ -1,8 +1,18 @@
 import asyncio
+import logging
+import time
+import typing
 from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+import m3u8
 from yt_dlp import YoutubeDL
-from ..utils import async_subprocess
+from ..utils import async_subprocess, get_http_client, iter_ordered, raise_for_status
 from ..downloader.enums import DownloadMode
+from ..downloader.exceptions import MasterPlaylistNotSupported
+
+logger = logging.getLogger(__name__)
 
 
 class StreamDownloader:
@@ -12,17 +22,30 @@ class StreamDownloader:
         ffmpeg_path: str,
         nm3u8dlre_path: str,
         silent: bool = False,
+        segment_concurrency: int = 8,
+        segment_retries: int = 3,
     ):
         self.download_mode = download_mode
         self.ffmpeg_path = ffmpeg_path
         self.nm3u8dlre_path = nm3u8dlre_path
         self.silent = silent
+        self.segment_concurrency = segment_concurrency
+        self.segment_retries = segment_retries
 
     async def download(self, stream_url: str, download_path: Path):
+        start_time = time.perf_counter()
+
         if self.download_mode == DownloadMode.YTDLP:
             await self.download_ytdlp(stream_url, download_path)
         elif self.download_mode == DownloadMode.NM3U8DLRE:
             await self.download_nm3u8dlre(stream_url, download_path)
+        elif self.download_mode == DownloadMode.NATIVE:
+            await self.download_native(stream_url, download_path)
+
+        logger.debug(
+            f'Downloaded "{download_path.name}" with {self.download_mode.value} '
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
 
     async def download_ytdlp(self, stream_url: str, download_path: Path) -> None:
         await asyncio.to_thread(
@@ -65,3 +88,106 @@ class StreamDownloader:
             str(download_path.parent),
             silent=self.silent,
         )
+
+    async def download_native(self, stream_url: str, download_path: Path) -> None:
+        download_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(download_path, "wb") as file:
+            async for segment in self.stream_native(stream_url):
+                file.write(segment)
+
+    async def stream_native(
+        self,
+        stream_url: str,
+    ) -> typing.AsyncGenerator[bytes, None]:
+        async with get_http_client().stream("GET", stream_url) as response:
+            raise_for_status(response)
+            if not self._is_m3u8_response(stream_url, response):
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+                return
+            playlist = m3u8.loads(
+                (await response.aread()).decode("utf-8"),
+                uri=stream_url,
+            )
+        if playlist.is_variant:
+            raise MasterPlaylistNotSupported(stream_url)
+
+        async for segment in iter_ordered(
+            (
+                self._get_segment(*segment_request)
+                for segment_request in self._get_segment_requests(playlist)
+            ),
+            self.segment_concurrency,
+        ):
+            yield segment
+
+    def _is_m3u8_response(self, stream_url: str, response: httpx.Response) -> bool:
+        return "mpegurl" in response.headers.get(
+            "content-type", ""
+        ).lower() or urlparse(stream_url).path.endswith(".m3u8")
+
+    def _get_segment_requests(
+        self,
+        playlist: m3u8.M3U8,
+    ) -> list[tuple[str, tuple[int, int] | None]]:
+        segment_requests = []
+        byterange_ends = {}
+        current_init_section = None
+
+        def get_byte_range(uri: str, byterange: str | None) -> tuple[int, int] | None:
+            if not byterange:
+                return None
+            length, _, offset = byterange.partition("@")
+            start = int(offset) if offset else byterange_ends.get(uri, 0)
+            byterange_ends[uri] = start + int(length)
+            return start, start + int(length) - 1
+
+        for segment in playlist.segments:
+            init_section = segment.init_section
+            if init_section and (
+                current_init_section is None
+                or (init_section.absolute_uri, init_section.byterange)
+                != (current_init_section.absolute_uri, current_init_section.byterange)
+            ):
+                segment_requests.append(
+                    (
+                        init_section.absolute_uri,
+                        get_byte_range(
+                            init_section.absolute_uri,
+                            init_section.byterange,
+                        ),
+                    )
+                )
+                current_init_section = init_section
+
+            segment_requests.append(
+                (
+                    segment.absolute_uri,
+                    get_byte_range(segment.absolute_uri, segment.byterange),
+                )
+            )
+
+        return segment_requests
+
+    async def _get_segment(
+        self,
+        segment_url: str,
+        byte_range: tuple[int, int] | None,
+    ) -> bytes:
+        headers = {"range": "bytes={}-{}".format(*byte_range)} if byte_range else {}
+
+        for attempt in range(self.segment_retries + 1):
+            try:
+                response = await get_http_client().get(segment_url, headers=headers)
+                raise_for_status(response, {200, 206})
+                if byte_range and response.status_code == 200:
+                    return response.content[byte_range[0] : byte_range[1] + 1]
+                return response.content
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and e.response.status_code != 429
+                    and e.response.status_code < 500
+                ) or attempt >= self.segment_retries:
+                    raise
+                await asyncio.sleep(2**attempt)
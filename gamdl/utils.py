@@ -1,11 +1,44 @@
 import asyncio
+import collections
+import itertools
 import json
+import logging
 import string
 import subprocess
 import typing
 
 import httpx
 
+logger = logging.getLogger(__name__)
+
+_http_clients: dict[str, httpx.AsyncClient] = {}
+_http_client_options: dict[str, typing.Any] = {
+    "limits": httpx.Limits(),
+    "http2": False,
+}
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._in_flight: dict[typing.Hashable, asyncio.Future] = {}
+
+    async def run(
+        self,
+        key: typing.Hashable,
+        func: typing.Callable[[], typing.Awaitable[typing.Any]],
+    ) -> typing.Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.debug(f"Joining in-flight request: {key}")
+        return await asyncio.shield(future)
+
+
+_single_flight = SingleFlight()
+
 
 def raise_for_status(httpx_response: httpx.Response, valid_responses: set[int] = {200}):
     if httpx_response.status_code not in valid_responses:
@@ -19,17 +52,66 @@ def safe_json(httpx_response: httpx.Response) -> dict:
         return {}
 
 
+def configure_http_clients(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+) -> None:
+    _http_client_options["limits"] = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    _http_client_options["http2"] = http2
+
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    client = _http_clients.get(name)
+    if client is not None and not client.is_closed:
+        return client
+
+    try:
+        client = httpx.AsyncClient(
+            limits=_http_client_options["limits"],
+            http2=_http_client_options["http2"],
+            timeout=60.0,
+        )
+    except ImportError:
+        logger.warning(
+            'HTTP/2 requires the "h2" package, falling back to HTTP/1.1'
+        )
+        _http_client_options["http2"] = False
+        client = httpx.AsyncClient(
+            limits=_http_client_options["limits"],
+            timeout=60.0,
+        )
+
+    _http_clients[name] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    while _http_clients:
+        _, client = _http_clients.popitem()
+        await client.aclose()
+
+
 async def get_response(
     url: str,
     valid_responses: set[int] = {200},
 ) -> httpx.Response:
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.get(url)
-        raise_for_status(response, valid_responses)
-        return response
+    response = await _single_flight.run(url, lambda: get_http_client().get(url))
+    raise_for_status(response, valid_responses)
+    return response
 
 
-async def async_subprocess(*args: str, silent: bool = False) -> None:
+async def async_subprocess(
+    *args: str,
+    silent: bool = False,
+    input_bytes: bytes | None = None,
+    capture_output: bool = False,
+) -> bytes | None:
     if silent:
         additional_args = {
             "stdout": subprocess.DEVNULL,
@@ -38,15 +120,23 @@ async def async_subprocess(*args: str, silent: bool = False) -> None:
     else:
         additional_args = {}
 
+    if input_bytes is not None:
+        additional_args["stdin"] = subprocess.PIPE
+
+    if capture_output:
+        additional_args["stdout"] = subprocess.PIPE
+
     proc = await asyncio.create_subprocess_exec(
         *args,
         **additional_args,
     )
-    await proc.communicate()
+    stdout, _ = await proc.communicate(input_bytes)
 
     if proc.returncode != 0:
         raise Exception(f'"{args[0]}" exited with code {proc.returncode}')
 
+    return stdout
+
 
 async def safe_gather(
     *tasks: typing.Awaitable[typing.Any],
@@ -64,6 +154,42 @@ async def safe_gather(
     )
 
 
+async def gather_or_cancel(
+    *aws: typing.Awaitable[typing.Any],
+) -> list[typing.Any]:
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task.done() and task.exception():
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def iter_ordered(
+    aws: typing.Iterable[typing.Awaitable[typing.Any]],
+    limit: int = 10,
+) -> typing.AsyncGenerator[typing.Any, None]:
+    aws = iter(aws)
+    pending = collections.deque(
+        asyncio.ensure_future(aw) for aw in itertools.islice(aws, limit)
+    )
+    try:
+        while pending:
+            result = await pending.popleft()
+            next_aw = next(aws, None)
+            if next_aw is not None:
+                pending.append(asyncio.ensure_future(next_aw))
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
 async def sequential_gather(
     *tasks: typing.Awaitable[typing.Any],
     interval: float = 0.5,
@@ -0,0 +1,152 @@
+import struct
+import unittest
+
+import gamdl.downloader  # noqa: F401 (initializes the downloader package first)
+from gamdl.processors.decryptor import Decryptor
+from gamdl.processors.mp4_boxes import find_box, iter_tenc_boxes
+
+
+def box(box_type: bytes, *payload: bytes) -> bytes:
+    payload = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def full_box(box_type: bytes, *payload: bytes) -> bytes:
+    return box(box_type, b"\x00\x00\x00\x00", *payload)
+
+
+def sinf(original_format: bytes, kid: bytes) -> bytes:
+    return box(
+        b"sinf",
+        box(b"frma", original_format),
+        full_box(b"schm", b"cenc", struct.pack(">I", 0x10000)),
+        box(
+            b"schi",
+            full_box(b"tenc", b"\x00\x00\x01\x10", kid),
+        ),
+    )
+
+
+def audio_sample_entry(kid: bytes) -> bytes:
+    return box(
+        b"enca",
+        bytes(6),
+        struct.pack(">H", 1),
+        bytes(20),
+        box(b"esds", bytes(4)),
+        sinf(b"mp4a", kid),
+    )
+
+
+def visual_sample_entry(kid: bytes) -> bytes:
+    return box(
+        b"encv",
+        bytes(6),
+        struct.pack(">H", 1),
+        bytes(70),
+        box(b"avcC", bytes(4)),
+        sinf(b"avc1", kid),
+    )
+
+
+def text_sample_entry(kid: bytes) -> bytes:
+    return box(
+        b"enct",
+        bytes(6),
+        struct.pack(">H", 1),
+        bytes(13),
+        sinf(b"tx3g", kid),
+    )
+
+
+def trak(handler_type: bytes, *sample_entries: bytes) -> bytes:
+    return box(
+        b"trak",
+        full_box(b"tkhd", bytes(80)),
+        box(
+            b"mdia",
+            full_box(b"mdhd", bytes(20)),
+            full_box(b"hdlr", bytes(4), handler_type, bytes(12), b"\x00"),
+            box(
+                b"minf",
+                box(
+                    b"stbl",
+                    full_box(
+                        b"stsd",
+                        struct.pack(">I", len(sample_entries)),
+                        *sample_entries,
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
+def movie(*traks: bytes) -> bytearray:
+    return bytearray(
+        box(b"ftyp", b"isom", bytes(4))
+        + box(b"moov", full_box(b"mvhd", bytes(96)), *traks)
+    )
+
+
+def get_kids(data: bytearray) -> list[bytes]:
+    return [
+        bytes(data[tenc.payload_offset + 8 : tenc.payload_offset + 24])
+        for tenc in iter_tenc_boxes(data, find_box(data, b"moov"))
+    ]
+
+
+class TencBoxTests(unittest.TestCase):
+    def test_finds_tenc_in_every_track(self):
+        data = movie(
+            trak(b"soun", audio_sample_entry(b"\xaa" * 16)),
+            trak(b"vide", visual_sample_entry(b"\xbb" * 16)),
+        )
+
+        self.assertEqual(get_kids(data), [b"\xaa" * 16, b"\xbb" * 16])
+
+    def test_finds_tenc_in_every_sample_entry(self):
+        data = movie(
+            trak(
+                b"soun",
+                audio_sample_entry(b"\xaa" * 16),
+                audio_sample_entry(b"\xbb" * 16),
+            ),
+        )
+
+        self.assertEqual(get_kids(data), [b"\xaa" * 16, b"\xbb" * 16])
+
+    def test_finds_tenc_for_other_handler_types(self):
+        data = movie(
+            trak(b"soun", audio_sample_entry(b"\xaa" * 16)),
+            trak(b"text", text_sample_entry(b"\xcc" * 16)),
+        )
+
+        self.assertEqual(get_kids(data), [b"\xaa" * 16, b"\xcc" * 16])
+
+    def test_fix_key_id_rewrites_every_kid(self):
+        data = movie(
+            trak(b"soun", audio_sample_entry(b"\xaa" * 16)),
+            trak(b"vide", visual_sample_entry(b"\xbb" * 16)),
+            trak(b"text", text_sample_entry(b"\xcc" * 16)),
+        )
+        size = len(data)
+
+        Decryptor(None, None).fix_key_id_buffer(data)
+
+        self.assertEqual(
+            get_kids(data),
+            [bytes.fromhex(f"{count:032}") for count in range(3)],
+        )
+        self.assertEqual(len(data), size)
+
+    def test_fix_key_id_without_moov(self):
+        data = bytearray(box(b"ftyp", b"isom", bytes(4)))
+
+        Decryptor(None, None).fix_key_id_buffer(data)
+
+        self.assertEqual(data, box(b"ftyp", b"isom", bytes(4)))
+
+
+if __name__ == "__main__":
+    unittest.main()